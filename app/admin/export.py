@@ -0,0 +1,226 @@
+"""
+Registrar export of every clearance request with its student and department.
+
+    python -m app.admin.export requests.csv.gz
+    python -m app.admin.export --serve 9200
+
+Rows are read a page at a time with a keyset cursor on the request id and
+written as they arrive, so memory use does not grow with the table. The format
+follows the file extension (.csv or .jsonl, plus .gz to compress). With
+--serve the same stream is offered over HTTP at
+/export?format=csv|jsonl&gzip=1 for downloading from a browser.
+"""
+import argparse
+import csv
+import hmac
+import io
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator
+from urllib.parse import parse_qs, urlparse
+
+from app.data.clearance_requests import EXPORT_PAGE_LIMIT, EXPORT_PAGE_SIZE, get_export_page
+from app.utils.metrics import counter
+from app.utils.supabase_config import create_admin_client, use_backend
+
+EXPORT_COLUMNS = (
+    "request_id", "status", "submitted_at", "department_id", "department_name",
+    "user_id", "student_id", "full_name", "email"
+)
+FORMATS = ("csv", "jsonl")
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "jsonl": "application/x-ndjson"}
+
+# Downloads must present this as a bearer token (or ?token=)
+EXPORT_TOKEN = os.environ.get("CLEARANCE_EXPORT_TOKEN")
+
+export_rows_total = counter("export_rows_total", "Rows written by registrar exports", ("format",))
+
+ProgressCallback = Callable[[int, float], None]
+
+
+def iter_export_rows(page_size: int = EXPORT_PAGE_SIZE, on_progress: ProgressCallback | None = None) -> Iterator[dict]:
+    """
+    Yields every clearance request, in id order, one page in memory at a time.
+    `on_progress(rows, elapsed_seconds)` is called after each page.
+    """
+    # A short page marks the end, so never ask for more than the database returns
+    page_size = max(1, min(page_size, EXPORT_PAGE_LIMIT))
+    started = time.perf_counter()
+    after_id, total = None, 0
+    while True:
+        rows = get_export_page(after_id, page_size)
+        yield from rows
+        total += len(rows)
+        if on_progress is not None:
+            on_progress(total, time.perf_counter() - started)
+        if len(rows) < page_size:
+            return
+        after_id = rows[-1]["request_id"]
+
+
+def encode_pages(rows: Iterator[dict], fmt: str, compress: bool = False, chunk_rows: int = 500) -> Iterator[bytes]:
+    """
+    Turns rows into encoded chunks of about `chunk_rows` rows each, gzipped
+    incrementally when `compress` is set.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format {fmt}, expected one of {', '.join(FORMATS)}")
+    # wbits=31 writes the gzip header and trailer, so the output is a .gz file
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, EXPORT_COLUMNS, extrasaction="ignore") if fmt == "csv" else None
+    if writer is not None:
+        writer.writeheader()
+
+    def drain() -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    pending = 0
+    for row in rows:
+        if writer is not None:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps({column: row.get(column) for column in EXPORT_COLUMNS}, default=str) + "\n")
+        pending += 1
+        if pending >= chunk_rows:
+            export_rows_total.inc(pending, format=fmt)
+            pending = 0
+            chunk = drain()
+            if chunk:
+                yield chunk
+    export_rows_total.inc(pending, format=fmt)
+    tail = drain()
+    if compressor:
+        tail += compressor.flush()
+    if tail:
+        yield tail
+
+
+def format_for_path(path: str) -> tuple[str, bool]:
+    """
+    (format, compressed) implied by a file name such as requests.csv.gz.
+    """
+    name = path.lower()
+    compress = name.endswith(".gz")
+    if compress:
+        name = name[:-3]
+    fmt = "jsonl" if name.endswith((".jsonl", ".ndjson")) else "csv"
+    return fmt, compress
+
+
+def export_to_file(path: str, fmt: str | None = None, compress: bool | None = None,
+                   page_size: int = EXPORT_PAGE_SIZE, on_progress: ProgressCallback | None = None) -> str:
+    """
+    Streams the export to `path`. The file only appears once it is complete.
+    """
+    implied_format, implied_compress = format_for_path(path)
+    fmt = fmt or implied_format
+    compress = implied_compress if compress is None else compress
+    partial = path + ".part"
+    with open(partial, "wb") as f:
+        for chunk in encode_pages(iter_export_rows(page_size, on_progress), fmt, compress):
+            f.write(chunk)
+    os.replace(partial, path)
+    return path
+
+
+class _ExportHandler(BaseHTTPRequestHandler):
+    # Chunked transfer encoding needs HTTP/1.1
+    protocol_version = "HTTP/1.1"
+    token: str = ""
+
+    def _authorised(self, query: dict) -> bool:
+        header = self.headers.get("Authorization", "")
+        supplied = header[7:] if header.startswith("Bearer ") else (query.get("token") or [""])[0]
+        return bool(self.token) and hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path != "/export":
+            self.send_error(404)
+            return
+        if not self._authorised(query):
+            self.send_error(401)
+            return
+        fmt = (query.get("format") or ["csv"])[0]
+        if fmt not in FORMATS:
+            self.send_error(400, f"format must be one of {', '.join(FORMATS)}")
+            return
+        compress = (query.get("gzip") or ["0"])[0] in ("1", "true")
+
+        filename = f"clearance_requests_{time.strftime('%Y%m%d')}.{fmt}{'.gz' if compress else ''}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/gzip" if compress else CONTENT_TYPES[fmt])
+        self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        started = time.perf_counter()
+        rows = {"count": 0}
+        try:
+            for chunk in encode_pages(iter_export_rows(on_progress=lambda n, _: rows.update(count=n)), fmt, compress):
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except Exception as e:
+            # Headers are gone; dropping the connection without the final
+            # chunk tells the client the download is incomplete
+            print(f"Export to {self.client_address[0]} failed after {rows['count']} rows: {e}")
+            self.close_connection = True
+            return
+        print(f"Exported {rows['count']} rows to {self.client_address[0]} in {time.perf_counter() - started:.1f}s")
+
+    def log_message(self, *_):
+        pass
+
+
+def start_export_server(port: int, token: str, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serves /export from a background thread. Requests must carry `token`.
+    """
+    if not token:
+        raise ValueError("An export token is required; set CLEARANCE_EXPORT_TOKEN")
+    handler = type("ExportHandler", (_ExportHandler,), {"token": token})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="export", daemon=True).start()
+    return server
+
+
+def _print_progress(rows: int, elapsed: float):
+    print(f"\r{rows} rows ({rows / max(elapsed, 1e-9):.0f} rows/s)", end="", file=sys.stderr, flush=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export clearance requests for registrar reporting")
+    parser.add_argument("output", nargs="?", help="File to write: .csv or .jsonl, optionally ending in .gz")
+    parser.add_argument("--format", choices=FORMATS, help="Override the format implied by the file name")
+    parser.add_argument("--page-size", type=int, default=EXPORT_PAGE_SIZE, help=f"Rows fetched per query, at most {EXPORT_PAGE_LIMIT}")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Serve /export over HTTP instead of writing a file")
+    args = parser.parse_args(argv)
+    if not args.output and args.serve is None:
+        parser.error("give an output file or --serve PORT")
+
+    use_backend(create_admin_client())
+    if args.serve is not None:
+        server = start_export_server(args.serve, EXPORT_TOKEN)
+        print(f"Serving exports on http://localhost:{args.serve}/export")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+
+    export_to_file(args.output, args.format, page_size=args.page_size, on_progress=_print_progress)
+    print(f"\nWrote {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
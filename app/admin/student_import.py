@@ -0,0 +1,294 @@
+"""
+Bulk student import from a CSV or Excel roster.
+
+    python -m app.admin.student_import roster.csv --batch-size 500 --workers 8
+
+The roster is read one row at a time. Valid rows are collected into batches;
+for each batch the students' accounts are created in parallel, then the
+students and student_info rows are written with one statement each. After
+every batch a checkpoint is saved next to the roster, so an interrupted import
+continues where it stopped when run again. Rejected rows are appended to
+<roster>.errors.csv.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import secrets
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Iterator
+
+from app.data.base import is_transient
+from app.data.student_info import upsert_student_infos
+from app.data.students import get_existing_student_ids, get_existing_student_user_ids, insert_students
+from app.data.users import get_user_ids_by_email
+from app.utils.supabase_config import create_admin_client, get_supabase, use_backend
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_WORKERS = 8
+
+# Roster headers, normalised to lower_snake_case, and the field each one fills
+COLUMN_ALIASES = {
+    "student_id": "student_id",
+    "registration_number": "student_id",
+    "reg_no": "student_id",
+    "admission_number": "student_id",
+    "full_name": "full_name",
+    "name": "full_name",
+    "email": "email",
+    "email_address": "email",
+    "gender": "gender",
+    "phone_number": "phone_number",
+    "phone": "phone_number",
+    "address": "address",
+    "course": "course",
+    "programme": "course",
+}
+REQUIRED_FIELDS = ("student_id", "full_name", "email")
+INFO_FIELDS = ("gender", "phone_number", "address", "course")
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+@dataclass
+class Checkpoint:
+    roster: str
+    size: int
+    # Data rows fully handled, in roster order
+    rows_done: int = 0
+    imported: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+    @classmethod
+    def load(cls, path: str, roster: str, size: int) -> "Checkpoint":
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(roster=roster, size=size)
+        if data.get("roster") != roster or data.get("size") != size:
+            # A different or edited roster; its progress does not apply
+            print(f"Ignoring checkpoint {path}: it belongs to another version of the roster")
+            return cls(roster=roster, size=size)
+        return cls(**data)
+
+    def save(self, path: str):
+        # Write then rename, so a crash never leaves half a checkpoint
+        with open(path + ".tmp", "w") as f:
+            json.dump(asdict(self), f)
+        os.replace(path + ".tmp", path)
+
+
+@dataclass
+class Batch:
+    # (line number, validated record) pairs
+    rows: list[tuple[int, dict]] = field(default_factory=list)
+    # Rows read for this batch, including rejected ones, for the checkpoint
+    consumed: int = 0
+
+
+def normalise_header(header: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(header or "").strip().lower()).strip("_")
+
+
+def read_roster(path: str) -> Iterator[dict]:
+    """
+    Yields the roster's rows as {header: value} dicts without loading the file.
+    """
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise SystemExit("Reading Excel rosters needs openpyxl (pip install openpyxl), or export the sheet as CSV")
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = next(rows, None) or []
+            for values in rows:
+                yield {header: value for header, value in zip(headers, values)}
+        finally:
+            workbook.close()
+        return
+
+    # utf-8-sig drops the byte order mark spreadsheet programs add to CSV exports
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def validate(raw: dict) -> tuple[dict, str | None]:
+    """
+    Maps a roster row onto student fields. Returns the record and, if the row
+    cannot be imported, the reason.
+    """
+    record = {}
+    for header, value in raw.items():
+        field_name = COLUMN_ALIASES.get(normalise_header(header))
+        if field_name and value is not None and str(value).strip():
+            record[field_name] = str(value).strip()
+    missing = [name for name in REQUIRED_FIELDS if not record.get(name)]
+    if missing:
+        return record, f"Missing {', '.join(missing)}"
+    record["email"] = record["email"].lower()
+    if not EMAIL_PATTERN.match(record["email"]):
+        return record, f"Invalid email {record['email']}"
+    return record, None
+
+
+class StudentImporter:
+    def __init__(self, roster: str, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = DEFAULT_WORKERS):
+        self.roster = os.path.abspath(roster)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.checkpoint_path = self.roster + ".checkpoint.json"
+        self.errors_path = self.roster + ".errors.csv"
+        self.checkpoint = Checkpoint.load(self.checkpoint_path, self.roster, os.path.getsize(self.roster))
+        # Ids and emails seen in this run, to catch duplicates within the roster
+        self._seen: set[str] = set()
+        self._seen_emails: set[str] = set()
+
+    def _reject(self, writer, line: int, record: dict, reason: str):
+        writer.writerow([line, record.get("student_id", ""), record.get("email", ""), reason])
+        self.checkpoint.failed += 1
+
+    def _batches(self, writer) -> Iterator[Batch]:
+        batch = Batch()
+        for index, raw in enumerate(read_roster(self.roster)):
+            # Resume: rows before the checkpoint were handled by an earlier run
+            if index < self.checkpoint.rows_done:
+                continue
+            batch.consumed += 1
+            line = index + 2  # the header is line 1
+            record, error = validate(raw)
+            if error:
+                self._reject(writer, line, record, error)
+            elif record["student_id"] in self._seen:
+                self.checkpoint.skipped += 1
+            elif record["email"] in self._seen_emails:
+                # One account per email, so a second student_id cannot share it
+                self._reject(writer, line, record, "Email already used by an earlier row")
+            else:
+                self._seen.add(record["student_id"])
+                self._seen_emails.add(record["email"])
+                batch.rows.append((line, record))
+            if len(batch.rows) >= self.batch_size:
+                yield batch
+                batch = Batch()
+        if batch.consumed:
+            yield batch
+
+    def _create_account(self, record: dict) -> str:
+        # Students set their own password through the reset flow
+        response = get_supabase().auth.admin.create_user({
+            "email": record["email"],
+            "password": secrets.token_urlsafe(16),
+            "email_confirm": True,
+            "user_metadata": {"full_name": record["full_name"], "student_id": record["student_id"]}
+        })
+        return response.user.id
+
+    def _import_batch(self, pool: ThreadPoolExecutor, batch: Batch, writer):
+        rows = batch.rows
+        if rows:
+            # Students already in the database, e.g. from an earlier partial run
+            existing = get_existing_student_ids([record["student_id"] for _, record in rows])
+            self.checkpoint.skipped += sum(1 for _, record in rows if record["student_id"] in existing)
+            rows = [(line, record) for line, record in rows if record["student_id"] not in existing]
+
+        # Account creation is one call per student, so it runs on the worker pool
+        results = list(pool.map(self._try_create_account, [record for _, record in rows]))
+
+        # Accounts that exist already (a batch interrupted after this step) are looked up in
+        # one query; only student accounts are adopted, never staff ones
+        retry_emails = [record["email"] for (_, record), (user_id, error) in zip(rows, results)
+                        if user_id is None and error and "already" in error.lower()]
+        known = get_user_ids_by_email(retry_emails, role="student") if retry_emails else {}
+
+        resolved = [user_id or known.get(record["email"]) for (_, record), (user_id, _) in zip(rows, results)]
+        # An adopted account may already be another student's
+        taken = get_existing_student_user_ids([user_id for user_id in resolved if user_id]) if known else set()
+
+        students, infos = [], []
+        for (line, record), (_, error), user_id in zip(rows, results, resolved):
+            if user_id is None:
+                self._reject(writer, line, record, error or "Account could not be created")
+                continue
+            if user_id in taken:
+                self._reject(writer, line, record, "Email belongs to an account that is already a student")
+                continue
+            taken.add(user_id)
+            students.append({
+                "id": user_id,
+                "full_name": record["full_name"],
+                "email": record["email"],
+                "student_id": record["student_id"]
+            })
+            infos.append({
+                "user_id": user_id,
+                "full_name": record["full_name"],
+                "registration_number": record["student_id"],
+                **{name: record[name] for name in INFO_FIELDS if name in record}
+            })
+
+        if students:
+            insert_students(students)
+            upsert_student_infos(infos)
+            self.checkpoint.imported += len(students)
+        self.checkpoint.rows_done += batch.consumed
+
+    def _try_create_account(self, record: dict) -> tuple[str | None, str | None]:
+        for attempt in range(3):
+            try:
+                return self._create_account(record), None
+            except Exception as e:
+                if not is_transient(e) or attempt == 2:
+                    return None, str(e)
+                time.sleep(0.5 * (2 ** attempt))
+        return None, None
+
+    def run(self) -> Checkpoint:
+        started = time.perf_counter()
+        start_rows = self.checkpoint.rows_done
+        if start_rows:
+            print(f"Resuming after {start_rows} rows")
+        new_errors_file = not os.path.exists(self.errors_path)
+        with open(self.errors_path, "a", newline="") as errors, ThreadPoolExecutor(self.workers) as pool:
+            writer = csv.writer(errors)
+            if new_errors_file:
+                writer.writerow(["line", "student_id", "email", "error"])
+            for batch in self._batches(writer):
+                self._import_batch(pool, batch, writer)
+                self.checkpoint.save(self.checkpoint_path)
+                errors.flush()
+                done = self.checkpoint.rows_done - start_rows
+                rate = done / max(time.perf_counter() - started, 1e-9)
+                print(
+                    f"{self.checkpoint.rows_done} rows: {self.checkpoint.imported} imported, "
+                    f"{self.checkpoint.skipped} skipped, {self.checkpoint.failed} failed ({rate:.0f} rows/s)"
+                )
+        return self.checkpoint
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import students from a CSV or Excel roster")
+    parser.add_argument("roster", help="Path to a .csv or .xlsx file with student_id, full_name and email columns")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows written per statement")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Parallel account creations")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start from the first row")
+    args = parser.parse_args(argv)
+
+    use_backend(create_admin_client())
+    importer = StudentImporter(args.roster, batch_size=args.batch_size, workers=args.workers)
+    if args.restart:
+        importer.checkpoint = Checkpoint(roster=importer.roster, size=importer.checkpoint.size)
+    result = importer.run()
+    print(f"Done. Rejected rows are listed in {importer.errors_path}")
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
 import flet as ft
 
+# Routes for each navigation destination, in order
+NAV_ROUTES = ["/home", "/progress", "/profile"]
+
 def create_bottom_nav(page: ft.Page, selected_index: int = 0):
     """
     Creates a bottom navigation bar for the app.
@@ -9,8 +12,7 @@ def create_bottom_nav(page: ft.Page, selected_index: int = 0):
         Handles navigation when a bottom navigation item is clicked.
         """
         index = e.control.selected_index
-        routes = ["/home", "/progress", "/profile"]  # Define routes for each index
-        page.go(routes[index])  # Navigate to the selected route
+        page.go(NAV_ROUTES[index])  # Navigate to the selected route
 
     return ft.NavigationBar(
         destinations=[
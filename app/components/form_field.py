@@ -1,4 +1,5 @@
 import flet as ft
+from app.utils.updates import request_update
 
 def show_tooltip(e, hint):
     e.control.tooltip = hint
@@ -47,7 +48,7 @@ def create_form_field(page: ft.Page, label: str, hint: str, required: bool = Tru
             error_text.visible = True
         else:
             error_text.visible = False
-        page.update()
+        request_update(page)
     
     field.on_blur = validate
     
@@ -0,0 +1,105 @@
+import concurrent.futures
+import os
+import random
+import time
+from typing import Any, Callable
+
+import httpx
+
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.instrumentation import record_query
+from app.utils.query_trace import trace_query, tracing_enabled
+from app.utils.supabase_config import get_supabase
+
+# Reads are safe to repeat, so transient failures are retried with a short backoff.
+# Writes are attempted once; the caller decides what to do on failure.
+READ_RETRIES = int(os.environ.get("CLEARANCE_READ_RETRIES", "2"))
+RETRY_BACKOFF = float(os.environ.get("CLEARANCE_RETRY_BACKOFF", "0.2"))
+
+# Shared by every query, so a degraded backend is detected once and then
+# failed fast everywhere instead of tying up a worker thread per call
+breaker = CircuitBreaker("backend")
+
+
+# Failures where the request may never have been answered: the connection
+# dropped or timed out, or the breaker refused to send it
+TRANSIENT_ERRORS = (
+    httpx.TransportError,
+    httpx.TimeoutException,
+    TimeoutError,
+    concurrent.futures.TimeoutError,
+    CircuitOpenError,
+)
+
+# Connection, resource and shutdown classes from Postgres, and PostgREST's
+# own connection errors
+TRANSIENT_CODES = ("08", "53", "57P", "PGRST000", "PGRST001", "PGRST002", "PGRST003")
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether an error means the request may not have been answered, so trying
+    again later can succeed. Everything else, including bugs in our own code,
+    is a definite failure.
+    """
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    code = getattr(error, "code", None)
+    if code is None:
+        return False
+    code = str(code)
+    # postgrest-py reports a non-JSON gateway reply (502/503/504...) with the
+    # HTTP status as the code; five-digit codes are SQLSTATEs, not statuses
+    if len(code) == 3 and code.isdigit():
+        return code.startswith("5")
+    return code.startswith(TRANSIENT_CODES)
+
+
+def _describe_rpc(params: dict) -> str:
+    return "&".join(f"{k}={'{...}' if isinstance(v, (dict, list)) else v}" for k, v in params.items())
+
+
+def _run(target: str, make_query: Callable[[], Any], retries: int, description: str | None = None) -> list[dict]:
+    for attempt in range(retries + 1):
+        breaker.before_call()
+        try:
+            query = make_query()
+            if not tracing_enabled():
+                data = query.execute().data
+            else:
+                started = time.perf_counter()
+                data = query.execute().data
+                rows = len(data) if isinstance(data, list) else int(data is not None)
+                params = description if description is not None else str(getattr(query, "params", ""))
+                trace_query(target, params, time.perf_counter() - started, rows)
+        except Exception as e:
+            if not is_transient(e):
+                # The backend answered, it just said no
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt == retries:
+                raise
+            time.sleep(random.uniform(0.5, 1) * RETRY_BACKOFF * (2 ** attempt))
+            continue
+        breaker.record_success()
+        record_query(data)
+        return data or []
+    return []
+
+
+def run_query(table: str, build: Callable[[Any], Any], *, retries: int = READ_RETRIES) -> list[dict]:
+    """
+    Builds a query against `table` with `build` and returns the resulting rows.
+    Every table access in the app goes through here.
+    """
+    return _run(table, lambda: build(get_supabase().table(table)), retries)
+
+
+def run_write(table: str, build: Callable[[Any], Any]) -> list[dict]:
+    return run_query(table, build, retries=0)
+
+
+def run_rpc(name: str, params: dict, *, retries: int = 0) -> list[dict]:
+    description = _describe_rpc(params) if tracing_enabled() else None
+    return _run(f"rpc/{name}", lambda: get_supabase().rpc(name, params), retries, description)
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from typing import Any
+
+from app.data.base import READ_RETRIES, run_query, run_rpc
+
+# form_data can be large, so it is only selected where it is actually shown
+REQUEST_COLUMNS = "id, department_id, status, submitted_at"
+
+
+def get_requests_for_user(user_id: str) -> list[dict]:
+    return run_query("clearancerequests", lambda q: q.select(REQUEST_COLUMNS).eq("user_id", user_id))
+
+
+@dataclass(frozen=True)
+class SubmissionResult:
+    request_id: Any
+    # False when the user had already submitted for this department
+    created: bool
+    status: str
+
+
+def submit_request(user_id: str, department_id, form_data: dict, message: str) -> SubmissionResult:
+    """
+    Inserts the request and the user's notification in one transaction.
+    A second submission for the same department returns the existing request.
+    """
+    rows = run_rpc("submit_clearance_request", {
+        "p_user_id": user_id,
+        "p_department_id": department_id,
+        "p_form_data": form_data,
+        "p_message": message
+    })
+    if not rows:
+        raise Exception("Failed to submit form")
+    row = rows[0]
+    return SubmissionResult(request_id=row["request_id"], created=row["created"], status=row["status"])
+
+
+def get_status_by_department(user_id: str) -> list[dict]:
+    """
+    One row per department with the user's latest request status and overall
+    completion percentage, aggregated by the database.
+    """
+    return run_rpc("clearance_status_for_user", {"p_user_id": user_id}, retries=READ_RETRIES)
+
+
+# Rows per page of a reviewer's queue; the database caps it at 200
+REVIEW_PAGE_SIZE = 50
+
+
+def get_review_page(department_id, after: tuple | None = None, status: str = "Pending",
+                    limit: int = REVIEW_PAGE_SIZE) -> list[dict]:
+    """
+    One page of a department's review queue, oldest first, without form_data.
+    Pass the (submitted_at, id) of the last row already shown as `after`.
+    """
+    submitted_at, request_id = after or (None, None)
+    return run_rpc("review_queue", {
+        "p_department_id": department_id,
+        "p_status": status,
+        "p_after_submitted_at": submitted_at,
+        "p_after_id": request_id,
+        "p_limit": limit
+    }, retries=READ_RETRIES)
+
+
+def get_form_data(request_id) -> dict:
+    """
+    A request's form for the review screen; the database checks the caller is a reviewer.
+    """
+    return run_rpc("review_form_data", {"p_request_id": request_id}, retries=READ_RETRIES) or {}
+
+
+# Ids sent per bulk statement; bounds request size and statement time
+BULK_CHUNK_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class BulkResult:
+    updated: list
+    # Request id -> why it was not changed
+    failures: dict
+
+
+def set_request_statuses(department_id, request_ids: list, status: str, message: str) -> BulkResult:
+    """
+    Moves many pending requests of a department to `status` and notifies
+    their students, one statement per chunk of ids. A chunk that fails lists
+    each of its ids under `failures`, and the remaining chunks still run.
+    """
+    updated, failures = [], {}
+    for start in range(0, len(request_ids), BULK_CHUNK_SIZE):
+        chunk = request_ids[start:start + BULK_CHUNK_SIZE]
+        try:
+            rows = run_rpc("bulk_set_request_status", {
+                "p_department_id": department_id,
+                "p_request_ids": chunk,
+                "p_status": status,
+                "p_message": message
+            })
+        except Exception as e:
+            # Earlier chunks are committed, so report what happened to each id
+            print(f"Bulk status change failed for {len(chunk)} requests: {e}")
+            failures.update((request_id, str(e)) for request_id in chunk)
+            continue
+        for row in rows:
+            if row["updated"]:
+                updated.append(row["request_id"])
+            else:
+                failures[row["request_id"]] = row["error"]
+    return BulkResult(updated=updated, failures=failures)
+
+
+# Rows per page of a registrar export, and the most the database returns per call
+EXPORT_PAGE_SIZE = 1000
+EXPORT_PAGE_LIMIT = 5000
+
+
+def get_export_page(after_id=None, limit: int = EXPORT_PAGE_SIZE) -> list[dict]:
+    """
+    One page of every clearance request joined with its student and
+    department, in id order. Pass the last request_id already read as
+    `after_id`. Needs the service role. `limit` is capped at EXPORT_PAGE_LIMIT.
+    """
+    limit = min(limit, EXPORT_PAGE_LIMIT)
+    return run_rpc("export_clearance_requests", {"p_after_id": after_id, "p_limit": limit}, retries=READ_RETRIES)
@@ -0,0 +1,171 @@
+import asyncio
+import itertools
+from datetime import datetime, timezone
+
+from app.data.base import is_transient
+from app.data.clearance_requests import get_requests_for_user, get_status_by_department
+from app.data.clearance_summary import get_clearance_summary
+from app.data.departments import get_department_by_id, get_departments, invalidate_departments
+from app.utils.cache import TTLCache
+from app.utils.executor import run_db
+
+# Per-user clearance status, shared by every screen that shows it. Realtime
+# changes keep entries current, so the TTL only bounds how long a missed event
+# can go unnoticed.
+STATUS_CACHE_SIZE = 2048
+STATUS_CACHE_TTL = 900
+
+status_cache = TTLCache(maxsize=STATUS_CACHE_SIZE, ttl=STATUS_CACHE_TTL)
+
+# Every status built gets a new version, so views rendered from it know when to rebuild
+_versions = itertools.count(1)
+
+
+# Cleared once the database reports that the summary table or the aggregate
+# function is not deployed, so older databases keep working
+_summary_available = True
+_aggregate_available = True
+
+# PostgREST's "table not in the schema cache" and Postgres' "undefined table"
+MISSING_TABLE_CODES = ("PGRST205", "42P01")
+
+
+def _statuses_from_summary(user_id: str) -> tuple[dict, float, str | None] | None:
+    summary = get_clearance_summary(user_id)
+    if summary is None:
+        # A student with no request yet has no row, but so does one the
+        # select cannot see, so let the aggregate decide
+        return None
+    statuses = dict(sorted(summary["statuses"].items()))
+    return statuses, float(summary["completion_percentage"]), summary["last_change_at"]
+
+
+def _statuses_from_aggregate(user_id: str) -> tuple[dict, float, str | None]:
+    rows = get_status_by_department(user_id)
+    statuses = {row["department_name"]: row["status"] for row in rows}
+    percentage = float(rows[0]["completion_percentage"]) if rows else 0
+    return statuses, percentage, None
+
+
+async def _statuses_from_tables(user_id: str) -> tuple[dict, float, str | None]:
+    # The two reads are independent, so they run side by side on the pool
+    requests, departments = await asyncio.gather(run_db(get_requests_for_user, user_id), run_db(get_departments))
+    # Latest request status per department id, then a single pass over departments
+    latest = {}
+    for request in sorted(requests, key=lambda r: r.get("submitted_at") or ""):
+        latest[request["department_id"]] = request["status"]
+    statuses = {dept["name"]: latest.get(dept["id"]) for dept in departments}
+    return statuses, _completion_percentage(statuses), None
+
+
+def _completion_percentage(statuses: dict) -> float:
+    completed = sum(1 for status in statuses.values() if status is not None)
+    return (completed / len(statuses)) * 100 if statuses else 0
+
+
+def _build_status(statuses: dict, percentage: float, last_change_at: str | None = None) -> dict:
+    values = list(statuses.values())
+    return {
+        "success": True,
+        "version": next(_versions),
+        "status": "cleared" if statuses and all(s is not None for s in statuses.values()) else "pending",
+        "completion_percentage": percentage,
+        # Department name -> whether anything was submitted, and the latest status itself
+        "submissions": {name: s is not None for name, s in statuses.items()},
+        "statuses": statuses,
+        "departments_total": len(values),
+        "departments_approved": values.count("Approved"),
+        "departments_pending": values.count("Pending"),
+        "last_change_at": last_change_at
+    }
+
+
+async def load_clearance_status(user_id: str) -> dict:
+    """
+    Loads a user's clearance status from the database and caches it.
+    """
+    global _summary_available, _aggregate_available
+    loaded = None
+    if _summary_available:
+        try:
+            loaded = await run_db(_statuses_from_summary, user_id)
+        except Exception as e:
+            if is_transient(e):
+                raise
+            if getattr(e, "code", None) in MISSING_TABLE_CODES:
+                _summary_available = False
+            print(f"Clearance summary failed, falling back to the aggregate: {e}")
+    if loaded is None and _aggregate_available:
+        try:
+            loaded = await run_db(_statuses_from_aggregate, user_id)
+        except Exception as e:
+            # Table reads would fail the same way against an unreachable backend
+            if is_transient(e):
+                raise
+            if getattr(e, "code", None) == "PGRST202":
+                _aggregate_available = False
+            print(f"Clearance status aggregate failed, falling back to table reads: {e}")
+    if loaded is None:
+        loaded = await _statuses_from_tables(user_id)
+
+    status = _build_status(*loaded)
+    status_cache.set(user_id, status)
+    return status
+
+
+async def fetch_clearance_status(user_id: str) -> dict | None:
+    status = status_cache.get(user_id)
+    if status is not None:
+        return status
+    try:
+        return await load_clearance_status(user_id)
+    except Exception as e:
+        print(f"Error fetching clearance status: {e}")
+        # An out-of-date status is more useful than an error while the backend is down
+        return status_cache.stale(user_id)
+
+
+def invalidate_clearance_status(user_id: str):
+    """
+    Drops a user's cached status, e.g. after they submit a form or a reviewer
+    changes one of their requests.
+    """
+    status_cache.invalidate(user_id)
+
+
+def patch_department_status(user_id: str, department_name: str, request_status: str | None):
+    """
+    Updates one department in a user's cached status without going back to the
+    database. Does nothing when the user has no cached status.
+    """
+    cached = status_cache.peek(user_id)
+    if cached is None:
+        return
+    # Every session of the user sees the same change; only the first one bumps the version
+    if department_name in cached["statuses"] and cached["statuses"][department_name] == request_status:
+        return
+    statuses = {**cached["statuses"], department_name: request_status}
+    changed_at = datetime.now(timezone.utc).isoformat()
+    status_cache.set(user_id, _build_status(statuses, _completion_percentage(statuses), changed_at))
+
+
+def apply_request_change(user_id: str, change_type: str, record: dict):
+    """
+    Brings a user's cached status in line with one clearancerequests change
+    pushed by realtime.
+    """
+    department = get_department_by_id(record.get("department_id")) if record else None
+    if change_type == "DELETE" or department is None:
+        # Deletes carry only the primary key, and unknown departments mean the catalogue moved on
+        invalidate_clearance_status(user_id)
+        return
+    patch_department_status(user_id, department["name"], record.get("status"))
+
+
+def invalidate_department_data():
+    """
+    Drops the department catalogue and every cached status built from it, for
+    when a department is added, renamed or removed.
+    """
+    invalidate_departments()
+    status_cache.clear()
@@ -0,0 +1,19 @@
+from app.data.base import READ_RETRIES, run_query
+
+SUMMARY_COLUMNS = (
+    "departments_total, departments_submitted, departments_approved, departments_pending, "
+    "completion_percentage, statuses, last_change_at"
+)
+
+
+def get_clearance_summary(user_id: str) -> dict | None:
+    """
+    The student's precomputed clearance summary, maintained by triggers on
+    clearancerequests. None when the student has never submitted anything.
+    """
+    rows = run_query(
+        "clearance_summary",
+        lambda q: q.select(SUMMARY_COLUMNS).eq("user_id", user_id).limit(1),
+        retries=READ_RETRIES
+    )
+    return rows[0] if rows else None
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from app.data.base import run_query
+
+# Departments are reference data that almost never change, so one copy is
+# shared by every session and reloaded at most once per TTL
+CATALOGUE_TTL = 600
+
+
+class DepartmentCatalogue:
+    def __init__(self, ttl: float = CATALOGUE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._rows: list[dict] = []
+        self._by_id: dict = {}
+        self._by_name: dict[str, dict] = {}
+        self._loaded_at: float | None = None
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def _ensure_loaded(self):
+        if self._is_fresh():
+            return
+        with self._lock:
+            # Another session may have finished loading while we waited
+            if self._is_fresh():
+                return
+            try:
+                rows = run_query("departments", lambda q: q.select("id, name").order("name"))
+            except Exception as e:
+                if not self._rows:
+                    raise
+                # Keep serving the last copy; it is retried on the next call
+                print(f"Reloading departments failed, using the cached list: {e}")
+                return
+            self._rows = rows
+            self._by_id = {row["id"]: row for row in rows}
+            self._by_name = {row["name"]: row for row in rows}
+            self._loaded_at = time.monotonic()
+
+    def all(self) -> list[dict]:
+        self._ensure_loaded()
+        return list(self._rows)
+
+    def get_by_name(self, name: str) -> dict | None:
+        self._ensure_loaded()
+        return self._by_name.get(name)
+
+    def get_by_id(self, department_id) -> dict | None:
+        self._ensure_loaded()
+        return self._by_id.get(department_id)
+
+    def invalidate(self):
+        self._loaded_at = None
+
+
+catalogue = DepartmentCatalogue()
+
+
+def get_departments() -> list[dict]:
+    return catalogue.all()
+
+
+def get_department_by_name(name: str) -> dict | None:
+    return catalogue.get_by_name(name)
+
+
+def get_department_by_id(department_id) -> dict | None:
+    return catalogue.get_by_id(department_id)
+
+
+def invalidate_departments():
+    catalogue.invalidate()
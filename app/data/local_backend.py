@@ -0,0 +1,626 @@
+import copy
+import itertools
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Callable
+
+# In-process stand-in for the hosted Supabase project. It implements the part of
+# the supabase-py client the app uses (table queries, rpc and auth) on top of
+# plain dicts, so the app can run, be tested and be benchmarked offline.
+# Select it with CLEARANCE_BACKEND=local.
+
+# Simulated round-trip time, so benchmarks against the stand-in are not unrealistically fast
+LOCAL_LATENCY_MS = float(os.environ.get("CLEARANCE_LOCAL_LATENCY_MS", "0"))
+
+SEED_DEPARTMENTS = ["Academic", "Finance", "Library", "ICT"]
+
+# Columns upserts match on when no on_conflict is given
+PRIMARY_KEYS = {
+    "student_info": ("user_id",),
+    "clearance_summary": ("user_id",),
+}
+
+UNIQUE_KEYS = {
+    "clearancerequests": [("user_id", "department_id")],
+    "students": [("student_id",)],
+}
+
+
+class LocalAPIError(Exception):
+    """
+    Mirrors postgrest's APIError closely enough for callers that inspect `.code`.
+    """
+    def __init__(self, message: str, code: str):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+class LocalResponse:
+    def __init__(self, data: Any):
+        self.data = data
+        self.count = len(data) if isinstance(data, list) else None
+
+
+class LocalQuery:
+    def __init__(self, backend: "LocalBackend", table: str):
+        self.backend = backend
+        self.table = table
+        self.operation = "select"
+        self.columns: list[str] | None = None
+        self.payload: Any = None
+        self.on_conflict: tuple | None = None
+        self.ignore_duplicates = False
+        self.filters: list[tuple[str, str, Any]] = []
+        self.ordering: list[tuple[str, bool]] = []
+        self.row_limit: int | None = None
+
+    # --- Builders ---
+    def select(self, columns: str = "*", **_):
+        self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def insert(self, rows, **_):
+        self.operation, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: str = "", ignore_duplicates: bool = False, **_):
+        self.operation, self.payload = "upsert", rows
+        self.ignore_duplicates = ignore_duplicates
+        if on_conflict:
+            self.on_conflict = tuple(c.strip() for c in on_conflict.split(","))
+        return self
+
+    def update(self, values: dict, **_):
+        self.operation, self.payload = "update", values
+        return self
+
+    def delete(self, **_):
+        self.operation = "delete"
+        return self
+
+    def _filter(self, op: str, column: str, value: Any):
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def is_(self, column, value):
+        return self._filter("is", column, None if value in (None, "null") else value)
+
+    def order(self, column: str, desc: bool = False, **_):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size: int, **_):
+        self.row_limit = size
+        return self
+
+    @property
+    def params(self) -> str:
+        """
+        The query rendered the way PostgREST would see it, for tracing.
+        """
+        parts = [f"select={','.join(self.columns) if self.columns else '*'}"]
+        for op, column, value in self.filters:
+            if op == "in":
+                value = "(" + ",".join(str(v) for v in value) + ")"
+            parts.append(f"{column}={op}.{'null' if value is None else value}")
+        if self.ordering:
+            parts.append("order=" + ",".join(f"{c}.{'desc' if d else 'asc'}" for c, d in self.ordering))
+        if self.row_limit is not None:
+            parts.append(f"limit={self.row_limit}")
+        return "&".join(parts)
+
+    # --- Execution ---
+    def _matches(self, row: dict) -> bool:
+        for op, column, value in self.filters:
+            current = row.get(column)
+            if op == "eq" and current != value:
+                return False
+            if op == "neq" and current == value:
+                return False
+            if op == "is" and current is not value:
+                return False
+            if op == "in" and current not in value:
+                return False
+            if op in ("gt", "gte", "lt", "lte"):
+                if current is None:
+                    return False
+                if op == "gt" and not current > value:
+                    return False
+                if op == "gte" and not current >= value:
+                    return False
+                if op == "lt" and not current < value:
+                    return False
+                if op == "lte" and not current <= value:
+                    return False
+        return True
+
+    def _project(self, row: dict) -> dict:
+        if self.columns is None:
+            return copy.deepcopy(row)
+        return {column: copy.deepcopy(row.get(column)) for column in self.columns}
+
+    def execute(self) -> LocalResponse:
+        self.backend.simulate_latency()
+        with self.backend.lock:
+            rows = self.backend.rows(self.table)
+            if self.operation == "insert":
+                result = [self.backend.insert_row(self.table, row) for row in _as_list(self.payload)]
+            elif self.operation == "upsert":
+                result = [
+                    row for row in (
+                        self.backend.upsert_row(self.table, row, self.on_conflict, self.ignore_duplicates)
+                        for row in _as_list(self.payload)
+                    )
+                    if row is not None
+                ]
+            elif self.operation == "update":
+                result = []
+                for row in rows:
+                    if self._matches(row):
+                        old = copy.deepcopy(row)
+                        row.update(copy.deepcopy(self.payload))
+                        self.backend.changed(self.table, "UPDATE", row, old)
+                        result.append(row)
+            elif self.operation == "delete":
+                result = [row for row in rows if self._matches(row)]
+                rows[:] = [row for row in rows if not self._matches(row)]
+                for row in result:
+                    self.backend.changed(self.table, "DELETE", {}, row)
+            else:
+                result = [row for row in rows if self._matches(row)]
+                for column, desc in reversed(self.ordering):
+                    result.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+                if self.row_limit is not None:
+                    result = result[:self.row_limit]
+            self.backend.fire_triggers()
+            return LocalResponse([self._project(row) for row in result])
+
+
+class LocalRpc:
+    def __init__(self, backend: "LocalBackend", name: str, params: dict):
+        self.backend = backend
+        self.name = name
+        self.params = params
+
+    def execute(self) -> LocalResponse:
+        function = self.backend.functions.get(self.name)
+        if function is None:
+            raise LocalAPIError(f"Could not find the function public.{self.name}", "PGRST202")
+        self.backend.simulate_latency()
+        with self.backend.lock:
+            try:
+                result = function(self.backend, **self.params)
+            finally:
+                self.backend.fire_triggers()
+            return LocalResponse(result)
+
+
+class LocalAuth:
+    def __init__(self, backend: "LocalBackend"):
+        self.backend = backend
+        self._accounts: dict[str, dict] = {}
+        self._session = None
+
+    def _user(self, account: dict) -> SimpleNamespace:
+        return SimpleNamespace(id=account["id"], email=account["email"], email_confirmed_at=account["confirmed_at"])
+
+    def _create_account(self, email: str, password: str) -> dict:
+        with self.backend.lock:
+            if email in self._accounts:
+                raise LocalAPIError("User already registered", "user_already_exists")
+            # Accounts are confirmed immediately; there is no email step offline
+            account = {"id": str(uuid.uuid4()), "email": email, "password": password, "confirmed_at": _now()}
+            self._accounts[email] = account
+            self.backend.insert_row("users", {"id": account["id"], "email": email, "role": "student"})
+        return account
+
+    def sign_up(self, credentials: dict) -> SimpleNamespace:
+        self.backend.simulate_latency()
+        account = self._create_account(credentials["email"], credentials["password"])
+        return SimpleNamespace(user=self._user(account), session=None)
+
+    def sign_in_with_password(self, credentials: dict) -> SimpleNamespace:
+        self.backend.simulate_latency()
+        account = self._accounts.get(credentials["email"])
+        if account is None or account["password"] != credentials["password"]:
+            raise LocalAPIError("Invalid login credentials", "invalid_credentials")
+        self._session = SimpleNamespace(user=self._user(account), access_token=str(uuid.uuid4()))
+        return SimpleNamespace(user=self._session.user, session=self._session)
+
+    def get_session(self):
+        return self._session
+
+    @property
+    def admin(self) -> "LocalAuth":
+        # Service-role calls; the stand-in has no separate key to check
+        return self
+
+    def create_user(self, attributes: dict) -> SimpleNamespace:
+        self.backend.simulate_latency()
+        account = self._create_account(attributes["email"], attributes.get("password") or str(uuid.uuid4()))
+        return SimpleNamespace(user=self._user(account))
+
+    def sign_out(self):
+        self._session = None
+
+
+class LocalChannel:
+    def __init__(self, realtime: "LocalRealtime", topic: str):
+        self.realtime = realtime
+        self.topic = topic
+        self.bindings: list[tuple[str, str, tuple[str, str] | None, Callable]] = []
+        self.joined = False
+
+    def on_postgres_changes(self, event: str, callback: Callable, table: str = "*", schema: str = "public",
+                            filter: str | None = None):
+        parsed = None
+        if filter:
+            column, _, value = filter.partition("=eq.")
+            parsed = (column, value)
+        self.bindings.append((event.upper(), table, parsed, callback))
+        return self
+
+    async def subscribe(self, callback: Callable | None = None):
+        self.joined = True
+        self.realtime.channels.append(self)
+        if callback:
+            callback("SUBSCRIBED", None)
+        return self
+
+    async def unsubscribe(self):
+        self.joined = False
+        if self in self.realtime.channels:
+            self.realtime.channels.remove(self)
+
+
+class LocalRealtime:
+    """
+    Change feed with the parts of realtime-py's AsyncRealtimeClient the app
+    uses. Callbacks run synchronously on whichever thread made the write.
+    """
+    def __init__(self):
+        self.channels: list[LocalChannel] = []
+        self.connected = False
+
+    async def connect(self):
+        self.connected = True
+
+    async def close(self):
+        self.connected = False
+        self.channels.clear()
+
+    def channel(self, topic: str) -> LocalChannel:
+        return LocalChannel(self, topic)
+
+    async def remove_channel(self, channel: LocalChannel):
+        await channel.unsubscribe()
+
+    def emit(self, table: str, event: str, record: dict, old_record: dict | None = None):
+        if not self.connected:
+            return
+        row = record or old_record or {}
+        payload = {
+            "data": {
+                "schema": "public",
+                "table": table,
+                "type": event,
+                "record": copy.deepcopy(record),
+                "old_record": copy.deepcopy(old_record or {}),
+                "commit_timestamp": _now()
+            },
+            "ids": []
+        }
+        for channel in list(self.channels):
+            for bound_event, bound_table, bound_filter, callback in channel.bindings:
+                if bound_event not in ("*", event) or bound_table not in ("*", table):
+                    continue
+                if bound_filter and str(row.get(bound_filter[0])) != bound_filter[1]:
+                    continue
+                callback(payload)
+
+
+class LocalBackend:
+    def __init__(self, latency_ms: float = LOCAL_LATENCY_MS, seed: bool = True):
+        self.latency_ms = latency_ms
+        self.lock = threading.RLock()
+        self.tables: dict[str, list[dict]] = {}
+        self.functions: dict[str, Callable[..., Any]] = dict(FUNCTIONS)
+        self.auth = LocalAuth(self)
+        self.local_realtime = LocalRealtime()
+        self._ids = itertools.count(1)
+        # Rows changed by the current statement, per table with a trigger
+        self._changed_rows: dict[str, list[dict]] = {}
+        if seed:
+            for name in SEED_DEPARTMENTS:
+                self.insert_row("departments", {"name": name})
+
+    # supabase-py compatible entry points
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    def from_(self, name: str) -> LocalQuery:
+        return self.table(name)
+
+    def rpc(self, name: str, params: dict | None = None) -> LocalRpc:
+        return LocalRpc(self, name, params or {})
+
+    # Storage helpers; callers hold self.lock
+    def simulate_latency(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def rows(self, table: str) -> list[dict]:
+        return self.tables.setdefault(table, [])
+
+    def changed(self, table: str, event: str, record: dict, old_record: dict | None = None):
+        self.local_realtime.emit(table, event, record, old_record)
+        if table in TRIGGERS:
+            self._changed_rows.setdefault(table, []).extend(r for r in (record, old_record) if r)
+
+    def fire_triggers(self):
+        """
+        Runs the statement-level triggers for what the statement just changed.
+        """
+        while self._changed_rows:
+            table, rows = self._changed_rows.popitem()
+            TRIGGERS[table](self, rows)
+
+    def _find(self, table: str, keys: tuple, row: dict) -> dict | None:
+        for existing in self.rows(table):
+            if all(existing.get(k) == row.get(k) for k in keys):
+                return existing
+        return None
+
+    def insert_row(self, table: str, row: dict) -> dict:
+        row = copy.deepcopy(row)
+        # Generated ids are unique by construction, so only given ones are checked
+        key_sets = UNIQUE_KEYS.get(table, [])
+        if "id" in row:
+            key_sets = [("id",), *key_sets]
+        else:
+            row["id"] = next(self._ids)
+        for keys in key_sets:
+            if all(row.get(k) is not None for k in keys) and self._find(table, keys, row):
+                raise LocalAPIError(f"duplicate key value violates unique constraint on {table} {keys}", "23505")
+        self.rows(table).append(row)
+        self.changed(table, "INSERT", row)
+        return row
+
+    def upsert_row(self, table: str, row: dict, on_conflict: tuple | None = None,
+                   ignore_duplicates: bool = False) -> dict | None:
+        keys = on_conflict or PRIMARY_KEYS.get(table, ("id",))
+        existing = self._find(table, keys, row) if all(k in row for k in keys) else None
+        if existing is None:
+            return self.insert_row(table, row)
+        if ignore_duplicates:
+            # ON CONFLICT DO NOTHING returns no row
+            return None
+        old = copy.deepcopy(existing)
+        existing.update(copy.deepcopy(row))
+        self.changed(table, "UPDATE", existing, old)
+        return existing
+
+
+def _as_list(rows) -> list[dict]:
+    return rows if isinstance(rows, list) else [rows]
+
+
+# --- Python versions of the SQL functions in supabase/migrations ---
+def _clearance_status_for_user(backend: LocalBackend, p_user_id) -> list[dict]:
+    latest = {}
+    requests = [r for r in backend.rows("clearancerequests") if r.get("user_id") == p_user_id]
+    for request in sorted(requests, key=lambda r: r.get("submitted_at") or ""):
+        latest[request["department_id"]] = request.get("status")
+    departments = sorted(backend.rows("departments"), key=lambda d: d["name"])
+    completed = sum(1 for d in departments if latest.get(d["id"]) is not None)
+    percentage = round(100 * completed / len(departments), 2) if departments else 0
+    return [
+        {
+            "department_id": d["id"],
+            "department_name": d["name"],
+            "status": latest.get(d["id"]),
+            "completion_percentage": percentage
+        }
+        for d in departments
+    ]
+
+
+def _submit_clearance_request(backend: LocalBackend, p_user_id, p_department_id, p_form_data, p_message) -> list[dict]:
+    existing = backend._find("clearancerequests", ("user_id", "department_id"),
+                             {"user_id": p_user_id, "department_id": p_department_id})
+    if existing:
+        return [{"request_id": existing["id"], "created": False, "status": existing["status"]}]
+    request = backend.insert_row("clearancerequests", {
+        "user_id": p_user_id,
+        "department_id": p_department_id,
+        "status": "Pending",
+        "form_data": p_form_data,
+        "submitted_at": _now()
+    })
+    backend.insert_row("notifications", {"user_id": p_user_id, "message": p_message, "created_at": _now()})
+    return [{"request_id": request["id"], "created": True, "status": "Pending"}]
+
+
+def _require_reviewer(backend: LocalBackend, message: str):
+    session = backend.auth.get_session()
+    caller = backend._find("users", ("id",), {"id": session.user.id}) if session else None
+    if (caller or {}).get("role") not in ("reviewer", "admin"):
+        raise LocalAPIError(message, "42501")
+
+
+def _review_queue(backend: LocalBackend, p_department_id, p_status="Pending", p_after_submitted_at=None,
+                  p_after_id=None, p_limit=50) -> list[dict]:
+    _require_reviewer(backend, "Only reviewers can read the review queue")
+    after = (p_after_submitted_at, p_after_id) if p_after_submitted_at is not None else None
+    requests = sorted(
+        (
+            r for r in backend.rows("clearancerequests")
+            if r.get("department_id") == p_department_id and r.get("status") == p_status
+            and r.get("submitted_at") is not None
+            and (after is None or (r["submitted_at"], r["id"]) > after)
+        ),
+        key=lambda r: (r["submitted_at"], r["id"])
+    )
+    students = {s["id"]: s for s in backend.rows("students")}
+    return [
+        {
+            "id": r["id"],
+            "user_id": r["user_id"],
+            "full_name": students.get(r["user_id"], {}).get("full_name"),
+            "student_id": students.get(r["user_id"], {}).get("student_id"),
+            "status": r["status"],
+            "submitted_at": r["submitted_at"]
+        }
+        for r in requests[:min(max(p_limit, 1), 200)]
+    ]
+
+
+def _review_form_data(backend: LocalBackend, p_request_id) -> dict | None:
+    _require_reviewer(backend, "Only reviewers can read request forms")
+    request = backend._find("clearancerequests", ("id",), {"id": p_request_id})
+    return request.get("form_data") if request else None
+
+
+def _bulk_set_request_status(backend: LocalBackend, p_department_id, p_request_ids, p_status, p_message) -> list[dict]:
+    _require_reviewer(backend, "Only reviewers can change request statuses")
+    if p_status not in ("Approved", "Rejected"):
+        raise LocalAPIError(f"Unsupported review status {p_status}", "22023")
+    by_id = {r["id"]: r for r in backend.rows("clearancerequests")}
+    result = []
+    for request_id in dict.fromkeys(p_request_ids):
+        request = by_id.get(request_id)
+        error = None
+        if request is None:
+            error = "Request not found"
+        elif request["department_id"] != p_department_id:
+            error = "Request belongs to another department"
+        elif request["status"] != "Pending":
+            error = f"Request is already {request['status']}"
+        if error:
+            result.append({"request_id": request_id, "updated": False,
+                           "status": request["status"] if request else None, "error": error})
+            continue
+        old = copy.deepcopy(request)
+        request["status"] = p_status
+        backend.changed("clearancerequests", "UPDATE", request, old)
+        backend.insert_row("notifications", {"user_id": request["user_id"], "message": p_message, "created_at": _now()})
+        result.append({"request_id": request_id, "updated": True, "status": p_status, "error": None})
+    return result
+
+
+def _export_clearance_requests(backend: LocalBackend, p_after_id=None, p_limit=1000) -> list[dict]:
+    after = p_after_id or 0
+    requests = sorted((r for r in backend.rows("clearancerequests") if r["id"] > after), key=lambda r: r["id"])
+    departments = {d["id"]: d for d in backend.rows("departments")}
+    students = {s["id"]: s for s in backend.rows("students")}
+    result = []
+    for r in requests[:min(max(p_limit, 1), 5000)]:
+        department = departments.get(r.get("department_id"), {})
+        student = students.get(r.get("user_id"), {})
+        result.append({
+            "request_id": r["id"],
+            "status": r.get("status"),
+            "submitted_at": r.get("submitted_at"),
+            "department_id": department.get("id"),
+            "department_name": department.get("name"),
+            "user_id": r.get("user_id"),
+            "student_id": student.get("student_id"),
+            "full_name": student.get("full_name"),
+            "email": student.get("email")
+        })
+    return result
+
+
+FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "clearance_status_for_user": _clearance_status_for_user,
+    "submit_clearance_request": _submit_clearance_request,
+    "review_queue": _review_queue,
+    "review_form_data": _review_form_data,
+    "bulk_set_request_status": _bulk_set_request_status,
+    "export_clearance_requests": _export_clearance_requests,
+}
+
+
+# --- Python versions of the triggers in supabase/migrations ---
+def _refresh_clearance_summary(backend: LocalBackend, user_ids: set, touch: bool = True):
+    user_ids = {u for u in user_ids if u is not None}
+    if not user_ids:
+        return
+    latest: dict[tuple, dict] = {}
+    for request in backend.rows("clearancerequests"):
+        key = (request.get("user_id"), request.get("department_id"))
+        if key[0] in user_ids and (key not in latest
+                                   or (request.get("submitted_at") or "") >= (latest[key].get("submitted_at") or "")):
+            latest[key] = request
+    departments = backend.rows("departments")
+    if not departments:
+        return
+    summaries = {row["user_id"]: row for row in backend.rows("clearance_summary")}
+    for user_id in user_ids:
+        statuses = {d["name"]: latest.get((user_id, d["id"]), {}).get("status") for d in departments}
+        values = list(statuses.values())
+        submitted = sum(1 for status in values if status is not None)
+        row = {
+            "user_id": user_id,
+            "departments_total": len(values),
+            "departments_submitted": submitted,
+            "departments_approved": values.count("Approved"),
+            "departments_pending": values.count("Pending"),
+            "completion_percentage": round(100 * submitted / len(values), 2),
+            "statuses": statuses
+        }
+        existing = summaries.get(user_id)
+        if existing is None:
+            backend.rows("clearance_summary").append({**row, "last_change_at": _now()})
+        else:
+            existing.update(row)
+            if touch:
+                existing["last_change_at"] = _now()
+
+
+def _clearance_summary_requests_trigger(backend: LocalBackend, rows: list[dict]):
+    _refresh_clearance_summary(backend, {row.get("user_id") for row in rows})
+
+
+def _clearance_summary_departments_trigger(backend: LocalBackend, rows: list[dict]):
+    _refresh_clearance_summary(backend, {row["user_id"] for row in backend.rows("clearance_summary")}, touch=False)
+
+
+TRIGGERS: dict[str, Callable[[LocalBackend, list[dict]], None]] = {
+    "clearancerequests": _clearance_summary_requests_trigger,
+    "departments": _clearance_summary_departments_trigger,
+}
+
+
+def create_local_client(**kwargs) -> LocalBackend:
+    return LocalBackend(**kwargs)
@@ -0,0 +1,322 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.data.base import is_transient
+from app.data.clearance_requests import submit_request
+from app.data.student_info import upsert_student_info
+from app.utils.metrics import counter, gauge
+
+# Writes that could not reach the backend are kept in a local SQLite file and
+# replayed by one background worker, so a flaky connection turns into a short
+# delay instead of an error and a wave of manual re-submissions.
+OUTBOX_PATH = os.environ.get(
+    "CLEARANCE_OUTBOX_PATH",
+    os.path.join(os.path.expanduser("~"), ".clearance", "outbox.db")
+)
+
+# Retry delay is BASE * 2^attempts seconds, capped at MAX, with jitter
+BACKOFF_BASE = float(os.environ.get("CLEARANCE_OUTBOX_BACKOFF", "1"))
+BACKOFF_MAX = float(os.environ.get("CLEARANCE_OUTBOX_BACKOFF_MAX", "300"))
+BATCH_SIZE = 20
+
+outbox_pending = gauge("outbox_pending", "Writes waiting in the outbox")
+outbox_queued_total = counter("outbox_queued_total", "Writes queued instead of sent directly", ("kind",))
+outbox_delivered_total = counter("outbox_delivered_total", "Queued writes delivered", ("kind",))
+outbox_retries_total = counter("outbox_retries_total", "Queued writes rescheduled after a transient error", ("kind",))
+outbox_failed_total = counter("outbox_failed_total", "Queued writes rejected by the backend", ("kind",))
+
+SCHEMA = """
+create table if not exists outbox (
+    id integer primary key autoincrement,
+    key text not null unique,
+    kind text not null,
+    user_id text not null,
+    payload text not null,
+    attempts integer not null default 0,
+    next_attempt_at real not null,
+    failed integer not null default 0,
+    last_error text,
+    created_at real not null
+)
+"""
+
+
+@dataclass(frozen=True)
+class Queued:
+    """
+    Returned instead of a result when a write was stored for later delivery.
+    """
+    key: str
+
+
+def _backoff(attempts: int) -> float:
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempts))
+    # Equal jitter, so sessions that failed together do not retry together
+    return random.uniform(delay / 2, delay)
+
+
+# --- Write kinds; each one is safe to deliver more than once ---
+def _submit(user_id: str, payload: dict):
+    # The RPC returns the existing request for a second submission
+    return submit_request(user_id, payload["department_id"], payload["form_data"], payload["message"])
+
+
+def _upsert_student_info(user_id: str, payload: dict):
+    return upsert_student_info(user_id, payload["info"])
+
+
+HANDLERS: dict[str, Callable[[str, dict], Any]] = {
+    "submit_clearance_request": _submit,
+    "upsert_student_info": _upsert_student_info,
+}
+
+SettledCallback = Callable[[Any, Exception | None], None]
+
+
+class Outbox:
+    def __init__(self, path: str = OUTBOX_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("pragma journal_mode=wal")
+        self._db.execute(SCHEMA)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._callbacks: dict[str, list[SettledCallback]] = {}
+        # While the backend is failing, new writes go straight to the queue
+        self._retry_at = 0.0
+        self._worker: threading.Thread | None = None
+        self._stopping = False
+        self._refresh_gauge()
+
+    # --- Queue ---
+    def enqueue(self, kind: str, key: str, user_id: str, payload: dict, replace: bool = False):
+        """
+        Stores a write for delivery. A write with the same key that is still
+        queued is kept as is, or overwritten when `replace` is set; one that
+        was rejected is always overwritten.
+        """
+        conflict = (
+            "do update set payload = excluded.payload, attempts = 0, failed = 0, last_error = null, "
+            "next_attempt_at = excluded.next_attempt_at"
+        )
+        if not replace:
+            conflict += " where outbox.failed = 1"
+        with self._lock:
+            cursor = self._db.execute(
+                "insert into outbox (key, kind, user_id, payload, next_attempt_at, created_at) "
+                f"values (?, ?, ?, ?, ?, ?) on conflict (key) {conflict}",
+                (key, kind, user_id, json.dumps(payload), max(time.time(), self._retry_at), time.time())
+            )
+        # Zero when the same write was already queued and kept as is
+        if cursor.rowcount > 0:
+            outbox_queued_total.inc(kind=kind)
+        self._refresh_gauge()
+        self.start()
+        self._wake.set()
+
+    def is_queued(self, key: str) -> bool:
+        with self._lock:
+            return self._db.execute("select 1 from outbox where key = ? and failed = 0", (key,)).fetchone() is not None
+
+    def pending(self, user_id: str, kind: str | None = None) -> list[dict]:
+        """
+        The user's queued writes, oldest first, for showing what has not synced yet.
+        """
+        query = "select key, kind, payload, attempts, failed, last_error from outbox where user_id = ?"
+        params: tuple = (user_id,)
+        if kind is not None:
+            query += " and kind = ?"
+            params += (kind,)
+        with self._lock:
+            rows = self._db.execute(query + " order by id", params).fetchall()
+        return [
+            {"key": key, "kind": k, "payload": json.loads(payload), "attempts": attempts,
+             "failed": bool(failed), "last_error": last_error}
+            for key, k, payload, attempts, failed, last_error in rows
+        ]
+
+    def on_settled(self, key: str, callback: SettledCallback):
+        """
+        Calls `callback(result, error)` from the worker thread once the queued
+        write with `key` is delivered or rejected.
+        """
+        with self._lock:
+            self._callbacks.setdefault(key, []).append(callback)
+
+    def deliver(self, kind: str, key: str, user_id: str, payload: dict, replace: bool = False,
+                on_settled: SettledCallback | None = None) -> Any:
+        """
+        Sends a write now, or queues it when the backend is unreachable. Returns
+        the handler's result, or Queued(key) after registering `on_settled` for
+        it. Definite errors are raised.
+        """
+        def queue() -> Queued:
+            if on_settled is not None:
+                self.on_settled(key, on_settled)
+            self.enqueue(kind, key, user_id, payload, replace)
+            return Queued(key)
+
+        # Queue behind a failing backend or an older write with the same key
+        if time.time() < self._retry_at or self.is_queued(key):
+            return queue()
+        try:
+            return HANDLERS[kind](user_id, payload)
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            print(f"Backend unreachable, queueing {key}: {e}")
+            self._retry_at = time.time() + _backoff(0)
+            return queue()
+
+    # --- Worker ---
+    def start(self):
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stopping = False
+            self._worker = threading.Thread(target=self._run, name="outbox", daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+
+    def _due(self) -> list[tuple]:
+        with self._lock:
+            return self._db.execute(
+                "select id, key, kind, user_id, payload, attempts from outbox "
+                "where failed = 0 and next_attempt_at <= ? order by next_attempt_at, id limit ?",
+                (time.time(), BATCH_SIZE)
+            ).fetchall()
+
+    def _next_wait(self) -> float | None:
+        with self._lock:
+            row = self._db.execute("select min(next_attempt_at) from outbox where failed = 0").fetchone()
+        if row[0] is None:
+            return None
+        return min(BACKOFF_MAX, max(0.05, row[0] - time.time()))
+
+    def _run(self):
+        while not self._stopping:
+            entries = self._due()
+            if not entries:
+                self._wake.wait(self._next_wait())
+                self._wake.clear()
+                continue
+            for entry in entries:
+                # One write at a time; stop the batch as soon as the backend fails again
+                if not self._attempt(*entry):
+                    break
+
+    def _attempt(self, row_id: int, key: str, kind: str, user_id: str, payload: str, attempts: int) -> bool:
+        try:
+            result = HANDLERS[kind](user_id, json.loads(payload))
+        except Exception as e:
+            if is_transient(e):
+                delay = _backoff(attempts + 1)
+                self._retry_at = time.time() + delay
+                with self._lock:
+                    self._db.execute(
+                        "update outbox set attempts = attempts + 1, next_attempt_at = ?, last_error = ? where id = ?",
+                        (self._retry_at, str(e), row_id)
+                    )
+                    # Everything else waits for the same retry time, so recovery is one
+                    # probe instead of a burst; their attempt counts are left alone
+                    self._db.execute(
+                        "update outbox set next_attempt_at = ? where failed = 0 and next_attempt_at < ?",
+                        (self._retry_at, self._retry_at)
+                    )
+                outbox_retries_total.inc(kind=kind)
+                return False
+            # Kept for inspection; the user is told through the callback
+            with self._lock:
+                self._db.execute("update outbox set failed = 1, last_error = ? where id = ?", (str(e), row_id))
+            outbox_failed_total.inc(kind=kind)
+            self._settle(key, None, e)
+            return True
+
+        with self._lock:
+            self._db.execute("delete from outbox where id = ?", (row_id,))
+        self._retry_at = 0.0
+        outbox_delivered_total.inc(kind=kind)
+        self._settle(key, result, None)
+        return True
+
+    def _settle(self, key: str, result: Any, error: Exception | None):
+        self._refresh_gauge()
+        with self._lock:
+            callbacks = self._callbacks.pop(key, [])
+        for callback in callbacks:
+            try:
+                callback(result, error)
+            except Exception as e:
+                print(f"Outbox callback for {key} failed: {e}")
+
+    def _refresh_gauge(self):
+        with self._lock:
+            count = self._db.execute("select count(*) from outbox where failed = 0").fetchone()[0]
+        outbox_pending.set(count)
+
+
+_outbox: Outbox | None = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> Outbox:
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = Outbox()
+    return _outbox
+
+
+def submission_key(user_id: str, department_id) -> str:
+    return f"submit:{user_id}:{department_id}"
+
+
+def submit_or_queue(user_id: str, department_id, department_name: str, form_data: dict, message: str,
+                    on_settled: SettledCallback | None = None):
+    """
+    Submits a clearance request, or queues it if the backend is unreachable.
+    Returns a SubmissionResult or Queued.
+    """
+    payload = {
+        "department_id": department_id,
+        "department_name": department_name,
+        "form_data": form_data,
+        "message": message
+    }
+    return get_outbox().deliver(
+        "submit_clearance_request", submission_key(user_id, department_id), user_id, payload, on_settled=on_settled
+    )
+
+
+def save_student_info_or_queue(user_id: str, info: dict, on_settled: SettledCallback | None = None):
+    """
+    Upserts the student's details, or queues them if the backend is
+    unreachable. A newer save replaces one that has not synced yet.
+    """
+    return get_outbox().deliver(
+        "upsert_student_info", f"student_info:{user_id}", user_id, {"info": info}, replace=True,
+        on_settled=on_settled
+    )
+
+
+def pending_departments(user_id: str) -> set[str]:
+    """
+    Names of departments whose submission is still waiting in the outbox.
+    """
+    return {
+        entry["payload"]["department_name"]
+        for entry in get_outbox().pending(user_id, "submit_clearance_request")
+        if not entry["failed"]
+    }
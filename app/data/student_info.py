@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from app.data.base import run_query, run_write
+
+INFO_COLUMNS = "user_id, full_name, gender, phone_number, address, course, registration_number"
+
+
+def get_student_info(user_id: str) -> dict | None:
+    rows = run_query("student_info", lambda q: q.select(INFO_COLUMNS).eq("user_id", user_id).limit(1))
+    return rows[0] if rows else None
+
+
+def upsert_student_info(user_id: str, info: dict) -> dict | None:
+    row = {**info, "user_id": user_id, "updated_at": datetime.now().isoformat()}
+    rows = run_write("student_info", lambda q: q.upsert(row))
+    return rows[0] if rows else None
+
+
+def upsert_student_infos(rows: list[dict]) -> list[dict]:
+    """
+    Upserts many students' details in one statement.
+    """
+    updated_at = datetime.now().isoformat()
+    return run_write("student_info", lambda q: q.upsert([{**row, "updated_at": updated_at} for row in rows]))
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from app.data.base import run_query, run_write
+
+
+def create_student(user_id: str, full_name: str, email: str, student_id: str) -> dict | None:
+    rows = run_write("students", lambda q: q.insert({
+        "id": user_id,
+        "full_name": full_name,
+        "email": email,
+        "student_id": student_id,
+        "created_at": datetime.now().isoformat()
+    }))
+    return rows[0] if rows else None
+
+
+def get_existing_student_ids(student_ids: list[str]) -> set[str]:
+    rows = run_query("students", lambda q: q.select("student_id").in_("student_id", student_ids))
+    return {row["student_id"] for row in rows}
+
+
+def get_existing_student_user_ids(user_ids: list[str]) -> set[str]:
+    rows = run_query("students", lambda q: q.select("id").in_("id", user_ids))
+    return {row["id"] for row in rows}
+
+
+def insert_students(students: list[dict]) -> list[dict]:
+    """
+    Inserts many students in one statement. Rows whose student_id already
+    exists are skipped, so a batch can safely be sent again.
+    """
+    return run_write("students", lambda q: q.upsert(students, on_conflict="student_id", ignore_duplicates=True))
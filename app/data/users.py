@@ -0,0 +1,16 @@
+from app.data.base import run_query
+
+USER_COLUMNS = "id, full_name, email, registration_number, role"
+
+
+def get_user(user_id: str) -> dict | None:
+    rows = run_query("users", lambda q: q.select(USER_COLUMNS).eq("id", user_id).limit(1))
+    return rows[0] if rows else None
+
+
+def get_user_ids_by_email(emails: list[str], role: str | None = None) -> dict[str, str]:
+    def build(q):
+        q = q.select("id, email").in_("email", emails)
+        return q.eq("role", role) if role else q
+    rows = run_query("users", build)
+    return {row["email"]: row["id"] for row in rows}
@@ -1,16 +1,14 @@
 import flet as ft
-from app.utils.supabase_config import supabase
-from datetime import datetime
+from app.data.outbox import Queued, save_student_info_or_queue
+from app.utils.router import get_view_stack
+from app.utils.updates import request_update
 import sys
 import os
 
 # Add the app directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'app')))
 
-def account_settings_page(page: ft.Page):
-    page.clean()
-    page.scroll = ft.ScrollMode.AUTO
-    page.bgcolor = ft.Colors.LIGHT_BLUE_50
+def account_settings_page(page: ft.Page) -> ft.View:
 
     # Back button
     back_button = ft.IconButton(
@@ -101,23 +99,45 @@ def account_settings_page(page: ft.Page):
             return
 
         user_info = {
-            "user_id": user_id,
             "full_name": full_name_field.value,
             "gender": gender_field.value,
             "phone_number": phone_number_field.value,
             "address": address_field.value,
             "course": course_field.value,
-            "registration_number": registration_number_field.value,
-            "updated_at": datetime.now().isoformat()
+            "registration_number": registration_number_field.value
         }
 
-        response = supabase.table("student_info").upsert(user_info).execute()
-        if response.data:
+        def on_synced(result, error):
+            # Runs on the outbox worker once queued details are sent or rejected
+            page.snack_bar = ft.SnackBar(
+                content=ft.Text("Your details have been synced" if error is None else f"Failed to sync details: {error}"),
+                bgcolor=ft.Colors.GREEN_600 if error is None else ft.Colors.RED_600
+            )
+            page.snack_bar.open = True
+            get_view_stack(page).discard("/profile")
+            request_update(page)
+
+        try:
+            result = save_student_info_or_queue(user_id, user_info, on_settled=on_synced)
+        except Exception as e:
+            print(f"Error saving student info: {e}")
+            result = None
+
+        if isinstance(result, Queued):
+            page.snack_bar = ft.SnackBar(
+                content=ft.Text("Connection problem: your details are saved and pending sync"),
+                bgcolor=ft.Colors.ORANGE_600
+            )
+            page.snack_bar.open = True
+            page.go("/profile")
+        elif result:
             page.snack_bar = ft.SnackBar(
                 content=ft.Text("Information saved successfully!"),
                 bgcolor=ft.Colors.GREEN_600
             )
             page.snack_bar.open = True
+            # The profile view on the stack shows the old details
+            get_view_stack(page).discard("/profile")
             page.go("/profile")
         else:
             page.snack_bar = ft.SnackBar(
@@ -139,26 +159,31 @@ def account_settings_page(page: ft.Page):
         width=300
     )
 
-    page.add(
-        ft.Container(
-            content=ft.Column(
-                controls=[
-                    back_button,
-                    ft.Text("Account Settings", size=24, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_800),
-                    full_name_field,
-                    gender_field,           
-                    phone_number_field,
-                    address_field,
-                    course_field,
-                    registration_number_field,
-                    save_button
-                ],
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                spacing=20
-            ),
-            padding=ft.padding.all(20),
-            bgcolor=ft.Colors.WHITE,
-            border_radius=10,
-            width=400
-        )
-    ) 
\ No newline at end of file
+    return ft.View(
+        "/account_settings",
+        [
+            ft.Container(
+                content=ft.Column(
+                    controls=[
+                        back_button,
+                        ft.Text("Account Settings", size=24, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_800),
+                        full_name_field,
+                        gender_field,           
+                        phone_number_field,
+                        address_field,
+                        course_field,
+                        registration_number_field,
+                        save_button
+                    ],
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                    spacing=20
+                ),
+                padding=ft.padding.all(20),
+                bgcolor=ft.Colors.WHITE,
+                border_radius=10,
+                width=400
+            )
+        ],
+        scroll=ft.ScrollMode.AUTO,
+        bgcolor=ft.Colors.LIGHT_BLUE_50
+    )
@@ -1,7 +1,9 @@
 import flet as ft
-from app.components.bottom_nav import create_bottom_nav
-from app.utils.supabase_config import supabase
-from datetime import datetime
+from app.data.clearance_status import fetch_clearance_status, patch_department_status
+from app.data.departments import get_department_by_name
+from app.data.outbox import Queued, pending_departments, submit_or_queue
+from app.utils.executor import run_db
+from app.utils.updates import request_update
 import asyncio
 import sys
 import os
@@ -9,16 +11,17 @@ import os
 # Add the app directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'app')))
 
-def department_form_page(page: ft.Page, dept_name: str):
+async def department_form_page(page: ft.Page, dept_name: str) -> ft.View:
     # Get department ID
-    dept_response = supabase.table("departments").select("id").eq("name", dept_name).execute()
-    if not dept_response.data:
+    department = await run_db(get_department_by_name, dept_name)
+    if not department:
         raise Exception("Department not found")
-    department_id = dept_response.data[0]['id']
+    department_id = department['id']
 
-    page.clean()
-    # Enable scrolling for the page
-    page.scroll = ft.ScrollMode.AUTO
+    # Submission state comes from the status map shared with the progress screen,
+    # so opening a form costs no queries when that map is warm
+    status = await fetch_clearance_status(page.session.get("user_id"))
+    request_status = status["statuses"].get(dept_name) if status else None
 
     # Back button handler
     def go_back(e):
@@ -134,23 +137,13 @@ def department_form_page(page: ft.Page, dept_name: str):
             # Show loading state
             submit_button.disabled = True
             submit_button.text = "Submitting..."
-            page.update()
+            request_update(page)
 
             # Get user ID from session
             user_id = page.session.get("user_id")
             if not user_id:
                 raise Exception("User not logged in")
 
-            # Check if user has already submitted for this department
-            existing_request = supabase.table("clearancerequests")\
-                .select("*")\
-                .eq("user_id", user_id)\
-                .eq("department_id", department_id)\
-                .execute()
-
-            if existing_request.data:
-                raise Exception(f"You have already submitted clearance for {dept_name} department")
-
             # Collect form data
             form_data = {}
             for field in form_sections:
@@ -158,23 +151,49 @@ def department_form_page(page: ft.Page, dept_name: str):
                     raise Exception(f"{field.label} is required")
                 form_data[field.label] = field.value
 
-            # Submit to Supabase using lowercase table names
-            response = supabase.table("clearancerequests").insert({
-                "user_id": user_id,
-                "department_id": department_id,
-                "status": "Pending",
-                "form_data": form_data,
-                "submitted_at": datetime.now().isoformat()
-            }).execute()
+            def on_synced(result, error):
+                # Runs on the outbox worker once a queued submission is sent or rejected
+                if error is None:
+                    patch_department_status(user_id, dept_name, result.status)
+                    submit_button.text = f"Already Submitted ({result.status})"
+                else:
+                    for field in form_sections:
+                        field.disabled = False
+                    submit_button.disabled = False
+                    submit_button.text = "Submit Form"
+                    page.snack_bar = ft.SnackBar(
+                        content=ft.Text(f"Error: {str(error)}"),
+                        bgcolor=ft.Colors.RED_600
+                    )
+                    page.snack_bar.open = True
+                request_update(page)
 
-            if response.data:
-                # Create notification (removed await)
-                supabase.table("notifications").insert({
-                    "user_id": user_id,
-                    "message": f"Clearance request submitted for {dept_name} department",
-                    "created_at": datetime.now().isoformat()
-                }).execute()
+            # Duplicate check, insert and notification happen in one round trip;
+            # if the backend cannot be reached the form is queued and sent later
+            result = await run_db(
+                submit_or_queue,
+                user_id,
+                department_id,
+                dept_name,
+                form_data,
+                f"Clearance request submitted for {dept_name} department",
+                on_settled=on_synced
+            )
+            if isinstance(result, Queued):
+                for field in form_sections:
+                    field.disabled = True
+                submit_button.disabled = True
+                submit_button.text = "Pending sync"
+                page.snack_bar = ft.SnackBar(
+                    content=ft.Text("Connection problem: your form is saved and will be sent automatically"),
+                    bgcolor=ft.Colors.ORANGE_600
+                )
+                page.snack_bar.open = True
+                request_update(page)
+                return
+            patch_department_status(user_id, dept_name, result.status)
 
+            if result.created:
                 # Show success dialog
                 dialog = ft.AlertDialog(
                     modal=True,
@@ -191,17 +210,17 @@ def department_form_page(page: ft.Page, dept_name: str):
 
                 page.dialog = dialog
                 dialog.open = True
-                page.update()
+                request_update(page)
 
                 # Disable the form
                 for field in form_sections:
                     field.disabled = True
                 submit_button.disabled = True
-                submit_button.text = "Already Submitted"
-                page.update()
+                submit_button.text = f"Already Submitted ({result.status})"
+                request_update(page)
 
             else:
-                raise Exception("Failed to submit form")
+                raise Exception(f"You have already submitted clearance for {dept_name} department")
 
         except Exception as e:
             print(f"Error occurred: {str(e)}")
@@ -212,7 +231,7 @@ def department_form_page(page: ft.Page, dept_name: str):
             page.snack_bar.open = True
             submit_button.disabled = False
             submit_button.text = "Submit Form"
-            page.update()
+            request_update(page)
 
     submit_button = ft.ElevatedButton(
         "Submit Form",
@@ -259,31 +278,16 @@ def department_form_page(page: ft.Page, dept_name: str):
         horizontal_alignment=ft.CrossAxisAlignment.CENTER
     )
 
-    page.add(main_content)
-    page.update()
+    # Disable the form if already submitted, or waiting in the outbox
+    if request_status or dept_name in await run_db(pending_departments, page.session.get("user_id")):
+        for field in form_sections:
+            field.disabled = True
+        submit_button.disabled = True
+        submit_button.text = f"Already Submitted ({request_status})" if request_status else "Pending sync"
 
-    # When loading the form, check if already submitted
-    try:
-        existing_request = supabase.table("clearancerequests")\
-            .select("*")\
-            .eq("user_id", page.session.get("user_id"))\
-            .eq("department_id", department_id)\
-            .execute()
-
-        if existing_request.data:
-            # Disable the form if already submitted
-            for field in form_sections:
-                field.disabled = True
-            submit_button.disabled = True
-            submit_button.text = "Already Submitted"
-            page.update()
-    except Exception as e:
-        print(f"Error checking submission status: {e}")
-
-def get_selected_index(route: str) -> int:
-        return {
-            "/home": 0,
-            "/progress": 1,
-            "/profile": 2,
-            "/account_settings": 3
-        }.get(route, 0)
\ No newline at end of file
+    return ft.View(
+        f"/department/{dept_name}",
+        [main_content],
+        # Enable scrolling for the page
+        scroll=ft.ScrollMode.AUTO
+    )
@@ -1,7 +1,7 @@
 import flet as ft
 import threading
 from app.components.bottom_nav import create_bottom_nav
-from app.utils.supabase_config import supabase
+from app.utils.view_cache import cached_view
 import sys
 import os
 
@@ -9,10 +9,16 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'app')))
 
 
-def home_screen(page: ft.Page):
-    page.clean()
-    page.bgcolor = ft.Colors.LIGHT_BLUE_50
+def home_screen(page: ft.Page) -> ft.View:
+    # The home screen is static, so its view is built once per session
+    return cached_view(page, "/home", 0, lambda: ft.View(
+        "/home",
+        build_home_controls(page),
+        bgcolor=ft.Colors.LIGHT_BLUE_50
+    ))
 
+
+def build_home_controls(page: ft.Page) -> list[ft.Control]:
     # Enhanced header with modern typography
     header = ft.Container(
         content=ft.Column([
@@ -131,11 +137,10 @@ def home_screen(page: ft.Page):
         expand=True,
     )
 
-    page.add(
+    return [
         header,
         ft.Container(
             content=main_content,
             expand=True,
         )
-    )
-    page.update()
\ No newline at end of file
+    ]
\ No newline at end of file
@@ -1,21 +1,25 @@
 import flet as ft
-from app.components.bottom_nav import create_bottom_nav
 from app.screens.account_settings import account_settings_page
-from app.utils.supabase_config import supabase
+from app.screens.review import REVIEWER_ROLES
+from app.data.clearance_status import fetch_clearance_status
+from app.data.outbox import get_outbox
+from app.data.student_info import get_student_info
+from app.data.users import get_user
+from app.utils.executor import run_db
+from app.utils.realtime import release_page
+from app.utils.updates import request_update
+from app.utils.supabase_config import get_supabase
 import sys
 import os
 # Add the app directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'app')))
 
-def profile_page(page: ft.Page):
-    page.clean()
-    # Enable scrolling for the page
-    page.scroll = ft.ScrollMode.AUTO
-    page.bgcolor = ft.Colors.LIGHT_BLUE_50  # Add a light background color
-
+async def profile_page(page: ft.Page) -> ft.View:
     # Fetch user data from the database
     user_id = page.session.get("user_id")
-    user_data = fetch_user_data(user_id)
+    user_data = await run_db(fetch_user_data, user_id)
+    # Shared with the progress screen, so usually served from the status cache
+    status = await fetch_clearance_status(user_id)
 
     # Profile Header Component
     def create_profile_header(user_data):
@@ -47,6 +51,11 @@ def profile_page(page: ft.Page):
                 ft.Text(user_data.get("email", "No email provided"),
                     size=16,
                     color=ft.Colors.BLUE_GREY_600
+                ),
+                ft.Text("Changes pending sync",
+                    size=14,
+                    color=ft.Colors.ORANGE_600,
+                    visible=user_data.get("pending_sync", False)
                 )
             ], 
             horizontal_alignment=ft.CrossAxisAlignment.CENTER
@@ -56,15 +65,25 @@ def profile_page(page: ft.Page):
 
     # Clearance Status Component
     def create_clearance_status():
+        percentage = status["completion_percentage"] if status else 0
+        if not status:
+            summary = "Status unavailable"
+        else:
+            summary = (
+                f"{status['departments_approved']} of {status['departments_total']} departments approved"
+                f" · {status['departments_pending']} awaiting review"
+            )
         return ft.Card(
             content=ft.Container(
                 content=ft.Column([
                     ft.ListTile(
                         title=ft.Text("Clearance Status", size=18, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_800),
-                        trailing=ft.Text("25%", size=16, color=ft.Colors.BLUE_800)
+                        subtitle=ft.Text(summary, size=14, color=ft.Colors.BLUE_GREY),
+                        trailing=ft.Text(f"{percentage:.0f}%", size=16, color=ft.Colors.BLUE_800),
+                        on_click=lambda _: page.go("/progress")
                     ),
                     ft.ProgressBar(
-                        value=0.25,
+                        value=percentage / 100,
                         bgcolor=ft.Colors.BLUE_50,
                         color=ft.Colors.BLUE_800,
                         height=8
@@ -128,6 +147,16 @@ def profile_page(page: ft.Page):
                         ),
                         on_click=lambda _: page.go("/account_settings"),
                     ),
+                    ft.Container(
+                        content=ft.ListTile(
+                            title=ft.Text("Review Requests", font_family="Open Sans"),
+                            leading=ft.Icon(ft.icons.FACT_CHECK_OUTLINED, color=ft.Colors.BLUE_800),
+                            trailing=ft.Icon(ft.icons.ARROW_FORWARD_IOS, size=16)
+                        ),
+                        on_click=lambda _: page.go("/review"),
+                        # Only department staff have a queue to review
+                        visible=(user_data or {}).get("role") in REVIEWER_ROLES,
+                    ),
                     ft.Container(
                         content=ft.ListTile(
                             title=ft.Text("Help & Support", font_family="Open Sans"),
@@ -171,24 +200,30 @@ def profile_page(page: ft.Page):
         horizontal_alignment=ft.CrossAxisAlignment.CENTER
     )
 
-    page.add(
-        ft.Container(
-            content=main_content,
-            padding=ft.padding.all(20),
-            expand=True,
-        ),
-        create_bottom_nav(page, 2)  # Add bottom navigation bar
+    return ft.View(
+        "/profile",
+        [
+            ft.Container(
+                content=main_content,
+                padding=ft.padding.all(20),
+                expand=True,
+            )
+        ],
+        # Enable scrolling for the page
+        scroll=ft.ScrollMode.AUTO,
+        bgcolor=ft.Colors.LIGHT_BLUE_50  # Add a light background color
     )
-    page.update()
 
 def fetch_user_data(user_id):
     try:
-        user_response = supabase.table("users").select("*").eq("id", user_id).execute()
-        info_response = supabase.table("student_info").select("*").eq("user_id", user_id).execute()
+        user = get_user(user_id)
+        info = get_student_info(user_id) or {}
+        # Details saved while offline are shown until the outbox sends them
+        queued = [e for e in get_outbox().pending(user_id, "upsert_student_info") if not e["failed"]]
+        if queued:
+            info = {**info, **queued[-1]["payload"]["info"]}
 
-        if user_response.data:
-            user = user_response.data[0]
-            info = info_response.data[0] if info_response.data else {}
+        if user:
             return {
                 "name": user.get("full_name", "Unknown"),
                 "email": user.get("email", "N/A"),
@@ -198,6 +233,7 @@ def fetch_user_data(user_id):
                 "address": info.get("address", "N/A"),
                 "gender": info.get("gender", "N/A"),
                 "course": info.get("course", "N/A"),
+                "pending_sync": bool(queued),
             }
         return None
     except Exception as e:
@@ -206,7 +242,8 @@ def fetch_user_data(user_id):
 
 def handle_logout(page: ft.Page):
     try:
-        supabase.auth.sign_out()
+        get_supabase().auth.sign_out()
+        release_page(page)
         page.session.clear()
         page.go("/")
     except Exception as e:
@@ -215,4 +252,4 @@ def handle_logout(page: ft.Page):
             bgcolor=ft.Colors.RED_600
         )
         page.snack_bar.open = True
-        page.update()
\ No newline at end of file
+        request_update(page)
\ No newline at end of file
@@ -1,23 +1,52 @@
 import flet as ft
-import supabase
-
-# Mock session storage
-session_storage = {}
-
-async def progress_page(page: ft.Page):
-    page.clean()
-    page.scroll = ft.ScrollMode.AUTO
-    page.bgcolor = ft.Colors.LIGHT_BLUE_50
+from app.data.clearance_status import fetch_clearance_status
+from app.data.outbox import pending_departments
+from app.utils.executor import run_db
+from app.utils.updates import request_update
+from app.utils.view_cache import cached_view, get_view_cache
 
+async def progress_page(page: ft.Page) -> ft.View:
     user_id = page.session.get("user_id")
     status = await fetch_clearance_status(user_id)
 
     if not status:
-        page.add(
-            ft.Text("Error loading clearance status", color=ft.Colors.RED_600)
+        return ft.View(
+            "/progress",
+            [ft.Text("Error loading clearance status", color=ft.Colors.RED_600)],
+            bgcolor=ft.Colors.LIGHT_BLUE_50
         )
+
+    # Reuse the view already built for this exact status and set of unsynced forms
+    pending = await run_db(pending_departments, user_id)
+    return cached_view(page, "/progress", (status["version"], frozenset(pending)), lambda: ft.View(
+        "/progress",
+        build_progress_controls(page, status, pending),
+        scroll=ft.ScrollMode.AUTO,
+        bgcolor=ft.Colors.LIGHT_BLUE_50
+    ))
+
+async def refresh_progress_view(page: ft.Page):
+    """
+    Re-renders the session's progress view in place after its status changed,
+    if that view is open.
+    """
+    view = next((v for v in page.views if v.route == "/progress"), None)
+    if view is None:
+        return
+    user_id = page.session.get("user_id")
+    status = await fetch_clearance_status(user_id)
+    if not status:
+        return
+    pending = await run_db(pending_departments, user_id)
+    version = (status["version"], frozenset(pending))
+    cache = get_view_cache(page)
+    if cache.get("/progress", version) is view:
         return
+    view.controls = build_progress_controls(page, status, pending)
+    cache.put("/progress", version, view)
+    request_update(page)
 
+def build_progress_controls(page: ft.Page, status: dict, pending: set[str] = frozenset()) -> list[ft.Control]:
     # Update progress indicator
     progress_indicator = ft.Container(
         content=ft.Column([
@@ -32,6 +61,12 @@ async def progress_page(page: ft.Page):
                 bgcolor=ft.Colors.BLUE_50,
                 color=ft.Colors.BLUE_800,
                 height=8
+            ),
+            ft.Text(
+                f"Last change {str(status.get('last_change_at') or '')[:16].replace('T', ' ')}",
+                size=12,
+                color=ft.Colors.BLUE_GREY,
+                visible=bool(status.get("last_change_at"))
             )
         ]),
         padding=20,
@@ -80,15 +115,6 @@ async def progress_page(page: ft.Page):
         alignment=ft.alignment.center
     )
 
-    # Check if status is already cached in session
-    if user_id not in session_storage:
-        # Fetch from backend and cache it
-        status = await fetch_clearance_status(user_id)
-        session_storage[user_id] = status
-    else:
-        # Use cached status
-        status = session_storage[user_id]
-
     # Check if all departments are cleared
     all_cleared = all(status["submissions"].values())
 
@@ -137,7 +163,7 @@ async def progress_page(page: ft.Page):
             border_radius=10,
             margin=ft.margin.only(bottom=20)
         )
-        page.add(header, clearance_complete_message)
+        return [header, clearance_complete_message]
     else:
         # Department status list
         department_grid = ft.ResponsiveRow(
@@ -157,7 +183,9 @@ async def progress_page(page: ft.Page):
                                     font_family="Poppins"
                                 ),
                                 subtitle=ft.Text(
-                                    "Submitted" if submitted else "Pending Submission",
+                                    # The reviewer's decision, so realtime changes show up here
+                                    f"Submitted · {status['statuses'].get(dept)}" if submitted
+                                    else "Pending sync" if dept in pending else "Pending Submission",
                                     color=ft.Colors.BLUE_GREY,
                                     font_family="Open Sans"
                                 )
@@ -182,12 +210,12 @@ async def progress_page(page: ft.Page):
             ]
         )
 
-        # Add department grid to page
-        page.add(
+        return [
             header,
             ft.Container(
                 content=ft.Column(
                     controls=[
+                        progress_indicator,
                         department_grid
                     ],
                     alignment=ft.MainAxisAlignment.START,
@@ -198,43 +226,7 @@ async def progress_page(page: ft.Page):
                 padding=ft.padding.all(20),
                 expand=True,
             )
-        )
-
-    page.update()
-
-async def fetch_clearance_status(user_id: str):
-    try:
-        # Get all submissions for this user
-        submissions = supabase.table("submissions").select("*").eq("user_id", user_id).execute()
-        
-        # Get all departments
-        departments = supabase.table("departments").select("*").execute()
-        
-        # Create a dictionary of department submissions
-        submission_status = {}
-        for dept in departments.data:
-            # Check if there's a submission for this department
-            is_submitted = any(
-                sub["department_id"] == dept["id"] 
-                for sub in submissions.data
-            ) if submissions.data else False
-            
-            submission_status[dept["name"]] = is_submitted
-        
-        # Calculate completion percentage
-        total_depts = len(departments.data)
-        completed_depts = sum(1 for status in submission_status.values() if status)
-        completion_percentage = (completed_depts / total_depts) * 100 if total_depts > 0 else 0
-
-        return {
-            "success": True,
-            "status": "cleared" if completed_depts == total_depts else "pending",
-            "completion_percentage": completion_percentage,
-            "submissions": submission_status
-        }
-    except Exception as e:
-        print(f"Error fetching clearance status: {e}")
-        return None
+        ]
 
 def download_certificate():
     # Logic to download the certificate
@@ -0,0 +1,280 @@
+import flet as ft
+from app.data.clearance_requests import REVIEW_PAGE_SIZE, get_form_data, get_review_page, set_request_statuses
+from app.data.departments import get_department_by_name, get_departments
+from app.data.users import get_user
+from app.utils.executor import run_db
+from app.utils.updates import request_update
+
+# Roles allowed to open the review screens
+REVIEWER_ROLES = ("reviewer", "admin")
+
+# Start fetching the next page when the reviewer scrolls this close to the end
+PREFETCH_PIXELS = 600
+
+# Bulk decisions can cover thousands of requests, so they get longer than a normal query
+BULK_TIMEOUT = 120
+
+# Failures listed in the report dialog; the rest are summarised
+REPORT_LIMIT = 50
+
+
+async def is_reviewer(page: ft.Page) -> bool:
+    role = page.session.get("user_role")
+    if role is None:
+        user = await run_db(get_user, page.session.get("user_id"))
+        role = (user or {}).get("role") or ""
+        page.session.set("user_role", role)
+    return role in REVIEWER_ROLES
+
+
+def create_header(title: str, subtitle: str, on_back=None) -> ft.Container:
+    controls = [
+        ft.Column([
+            ft.Text(title, size=22, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE, font_family="Poppins"),
+            ft.Text(subtitle, size=14, color=ft.Colors.WHITE, font_family="Open Sans", opacity=0.9)
+        ], spacing=4)
+    ]
+    if on_back:
+        controls.insert(0, ft.IconButton(
+            icon=ft.Icons.ARROW_BACK,
+            on_click=on_back,
+            icon_color=ft.Colors.WHITE,
+            tooltip="Go Back"
+        ))
+    return ft.Container(
+        content=ft.Row(controls),
+        padding=ft.padding.symmetric(horizontal=20, vertical=15),
+        gradient=ft.LinearGradient(
+            begin=ft.alignment.top_center,
+            end=ft.alignment.bottom_center,
+            colors=["#4FC3F7", "#2196F3"]
+        ),
+        border_radius=15,
+        margin=ft.margin.only(left=10, right=10, top=10)
+    )
+
+
+async def review_index_page(page: ft.Page) -> ft.View:
+    departments = await run_db(get_departments)
+    return ft.View(
+        "/review",
+        [
+            create_header("Review Requests", "Choose a department queue"),
+            ft.Column(
+                controls=[
+                    ft.ListTile(
+                        leading=ft.Icon(ft.Icons.INBOX, color=ft.Colors.BLUE_600),
+                        title=ft.Text(dept["name"], weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_800),
+                        trailing=ft.Icon(ft.Icons.CHEVRON_RIGHT),
+                        on_click=lambda e, name=dept["name"]: page.go(f"/review/{name}")
+                    )
+                    for dept in departments
+                ]
+            )
+        ],
+        scroll=ft.ScrollMode.AUTO,
+        bgcolor=ft.Colors.LIGHT_BLUE_50
+    )
+
+
+async def review_page(page: ft.Page, dept_name: str) -> ft.View:
+    department = await run_db(get_department_by_name, dept_name)
+    if not department:
+        raise Exception("Department not found")
+
+    # Keyset cursor: (submitted_at, id) of the last request shown
+    state = {"after": None, "loading": False, "done": False}
+    selected: set = set()
+    tiles: dict = {}
+    checkboxes: dict = {}
+
+    count_text = ft.Text("", size=14, color=ft.Colors.BLUE_GREY_700)
+    selection_text = ft.Text("", size=14, color=ft.Colors.BLUE_GREY_700)
+
+    # ListView only builds the rows that are on screen, so long queues stay cheap to render
+    queue = ft.ListView(expand=True, spacing=6, padding=10, on_scroll_interval=100)
+
+    load_more_button = ft.TextButton("Load more", icon=ft.Icons.EXPAND_MORE)
+
+    def update_counts():
+        count_text.value = f"{len(queue.controls)}{'' if state['done'] else '+'} pending requests"
+        selection_text.value = f"{len(selected)} selected" if selected else ""
+        approve_button.disabled = reject_button.disabled = not selected
+
+    def on_select(e, request_id):
+        if e.control.value:
+            selected.add(request_id)
+        else:
+            selected.discard(request_id)
+        update_counts()
+        request_update(page)
+
+    def select_all_loaded(e):
+        for request_id, checkbox in checkboxes.items():
+            checkbox.value = e.control.value
+        selected.clear()
+        if e.control.value:
+            selected.update(checkboxes)
+        update_counts()
+        request_update(page)
+
+    def request_tile(row: dict) -> ft.ExpansionTile:
+        details = ft.Column([ft.Text("Loading form...", color=ft.Colors.BLUE_GREY)], spacing=4)
+
+        async def on_expand(e):
+            # form_data is only fetched the first time a request is opened
+            if e.data != "true" or tile.data:
+                return
+            tile.data = True
+            try:
+                form_data = await run_db(get_form_data, row["id"])
+                details.controls = [
+                    ft.Text(f"{label}: {value}", size=14, color=ft.Colors.BLUE_GREY_800, selectable=True)
+                    for label, value in form_data.items()
+                ] or [ft.Text("No form data", color=ft.Colors.BLUE_GREY)]
+            except Exception as e:
+                print(f"Error loading form data: {e}")
+                tile.data = None
+                details.controls = [ft.Text("Could not load the form", color=ft.Colors.RED_600)]
+            request_update(page)
+
+        submitted = str(row.get("submitted_at") or "")[:16].replace("T", " ")
+        checkbox = ft.Checkbox(value=row["id"] in selected, on_change=lambda e: on_select(e, row["id"]))
+        checkboxes[row["id"]] = checkbox
+        tile = ft.ExpansionTile(
+            leading=checkbox,
+            title=ft.Text(row.get("full_name") or "Unknown student", weight=ft.FontWeight.BOLD,
+                          color=ft.Colors.BLUE_800),
+            subtitle=ft.Text(f"{row.get('student_id') or 'N/A'} · submitted {submitted}", color=ft.Colors.BLUE_GREY),
+            controls=[ft.Container(details, padding=ft.padding.only(left=16, right=16, bottom=10))],
+            bgcolor=ft.Colors.WHITE,
+            collapsed_bgcolor=ft.Colors.WHITE,
+            on_change=on_expand
+        )
+        tiles[row["id"]] = tile
+        return tile
+
+    async def load_next_page(e=None):
+        if state["loading"] or state["done"]:
+            return
+        state["loading"] = True
+        try:
+            rows = await run_db(get_review_page, department["id"], state["after"])
+        except Exception as ex:
+            print(f"Error loading review queue: {ex}")
+            count_text.value = "Could not load requests, try again"
+            state["loading"] = False
+            request_update(page)
+            return
+        queue.controls.extend(request_tile(row) for row in rows)
+        if rows:
+            state["after"] = (rows[-1]["submitted_at"], rows[-1]["id"])
+        if len(rows) < REVIEW_PAGE_SIZE:
+            state["done"] = True
+            load_more_button.visible = False
+        update_counts()
+        state["loading"] = False
+        request_update(page)
+
+    def show_report(status: str, result):
+        lines = [f"Request {request_id}: {reason}" for request_id, reason in list(result.failures.items())[:REPORT_LIMIT]]
+        if len(result.failures) > REPORT_LIMIT:
+            lines.append(f"...and {len(result.failures) - REPORT_LIMIT} more")
+        dialog = ft.AlertDialog(
+            title=ft.Text(f"{len(result.updated)} {status.lower()}, {len(result.failures)} not changed",
+                          size=18, weight=ft.FontWeight.BOLD),
+            content=ft.Column([ft.Text(line, size=14) for line in lines], scroll=ft.ScrollMode.AUTO, height=300),
+            actions=[ft.TextButton("Close", on_click=lambda _: close_report(dialog))]
+        )
+        page.dialog = dialog
+        dialog.open = True
+
+    def close_report(dialog):
+        dialog.open = False
+        request_update(page)
+
+    async def apply_decision(status: str):
+        request_ids = list(selected)
+        if not request_ids:
+            return
+        approve_button.disabled = reject_button.disabled = True
+        selection_text.value = f"Updating {len(request_ids)} requests..."
+        request_update(page)
+        try:
+            result = await run_db(
+                set_request_statuses,
+                department["id"],
+                request_ids,
+                status,
+                f"Your {dept_name} clearance request was {status.lower()}",
+                timeout=BULK_TIMEOUT
+            )
+        except Exception as e:
+            print(f"Error applying bulk decision: {e}")
+            page.snack_bar = ft.SnackBar(content=ft.Text(f"Error: {str(e)}"), bgcolor=ft.Colors.RED_600)
+            page.snack_bar.open = True
+            update_counts()
+            request_update(page)
+            return
+
+        # Decided requests leave the pending queue; failed ones stay for another look
+        decided = set(result.updated)
+        removed = {id(tiles.pop(i)) for i in decided if i in tiles}
+        queue.controls[:] = [tile for tile in queue.controls if id(tile) not in removed]
+        for request_id in decided:
+            checkboxes.pop(request_id, None)
+        selected.clear()
+        for checkbox in checkboxes.values():
+            checkbox.value = False
+        select_all.value = False
+        update_counts()
+        if result.failures:
+            show_report(status, result)
+        else:
+            page.snack_bar = ft.SnackBar(
+                content=ft.Text(f"{len(decided)} requests {status.lower()}"),
+                bgcolor=ft.Colors.GREEN_600
+            )
+            page.snack_bar.open = True
+        request_update(page)
+
+    async def on_scroll(e):
+        if e.max_scroll_extent is not None and e.max_scroll_extent - e.pixels < PREFETCH_PIXELS:
+            await load_next_page()
+
+    select_all = ft.Checkbox(label="Select all loaded", on_change=select_all_loaded)
+    approve_button = ft.ElevatedButton(
+        "Approve",
+        icon=ft.Icons.CHECK,
+        on_click=lambda _: page.run_task(apply_decision, "Approved"),
+        style=ft.ButtonStyle(bgcolor=ft.Colors.GREEN_600, color=ft.Colors.WHITE),
+        disabled=True
+    )
+    reject_button = ft.ElevatedButton(
+        "Reject",
+        icon=ft.Icons.CLOSE,
+        on_click=lambda _: page.run_task(apply_decision, "Rejected"),
+        style=ft.ButtonStyle(bgcolor=ft.Colors.RED_600, color=ft.Colors.WHITE),
+        disabled=True
+    )
+
+    queue.on_scroll = on_scroll
+    load_more_button.on_click = load_next_page
+
+    await load_next_page()
+
+    return ft.View(
+        f"/review/{dept_name}",
+        [
+            create_header(f"{dept_name} Queue", "Pending clearance requests, oldest first",
+                          on_back=lambda _: page.go("/review")),
+            ft.Container(count_text, padding=ft.padding.only(left=20, top=10)),
+            ft.Container(
+                ft.Row([select_all, selection_text, approve_button, reject_button], wrap=True, spacing=10),
+                padding=ft.padding.symmetric(horizontal=20)
+            ),
+            queue,
+            ft.Row([load_more_button], alignment=ft.MainAxisAlignment.CENTER)
+        ],
+        bgcolor=ft.Colors.LIGHT_BLUE_50
+    )
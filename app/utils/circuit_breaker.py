@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+from app.utils.metrics import counter, gauge
+
+# Consecutive transient failures that open the circuit, and how long it stays
+# open before one trial call is let through
+BREAKER_FAILURES = int(os.environ.get("CLEARANCE_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.environ.get("CLEARANCE_BREAKER_RESET", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+circuit_state = gauge("circuit_state", "Circuit breaker state (0 closed, 1 open, 2 half-open)", ("name",))
+circuit_transitions_total = counter("circuit_transitions_total", "Circuit breaker state changes", ("name", "state"))
+circuit_rejections_total = counter("circuit_rejections_total", "Calls failed fast by an open circuit", ("name",))
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a backend that is known to be failing.
+    """
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} is unavailable, retrying in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast after `failures` consecutive errors, then lets a single
+    trial call through every `reset` seconds until one succeeds.
+    """
+    def __init__(self, name: str, failures: int = BREAKER_FAILURES, reset: float = BREAKER_RESET):
+        self.name = name
+        self.failures = failures
+        self.reset = reset
+        self.state = CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        circuit_state.set(STATE_VALUES[CLOSED], name=name)
+
+    def _move_to(self, state: str):
+        # Callers hold self._lock
+        if state == self.state:
+            return
+        self.state = state
+        circuit_state.set(STATE_VALUES[state], name=self.name)
+        circuit_transitions_total.inc(name=self.name, state=state)
+        if state != CLOSED:
+            print(f"Circuit {self.name} is now {state}")
+
+    def before_call(self):
+        """
+        Raises CircuitOpenError unless the call may go ahead.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            waited = time.monotonic() - self._opened_at
+            if self.state == OPEN and waited >= self.reset:
+                self._move_to(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            circuit_rejections_total.inc(name=self.name)
+            raise CircuitOpenError(self.name, max(0.0, self.reset - waited))
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._trial_running = False
+            self._move_to(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+                self._move_to(OPEN)
+
+    def is_open(self) -> bool:
+        return self.state != CLOSED
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self._consecutive}
@@ -0,0 +1,36 @@
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+# The supabase client is synchronous, so async handlers hand every call to a
+# bounded pool instead of blocking Flet's event loop
+DB_POOL_SIZE = int(os.environ.get("CLEARANCE_DB_POOL_SIZE", "16"))
+DB_CALL_TIMEOUT = float(os.environ.get("CLEARANCE_DB_TIMEOUT", "15"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+    return _executor
+
+
+async def run_db(func: Callable[..., Any], *args, timeout: float | None = None, **kwargs) -> Any:
+    """
+    Runs a blocking data-access call on the database pool and awaits its result.
+    Raises asyncio.TimeoutError if it takes longer than `timeout` seconds.
+    """
+    loop = asyncio.get_running_loop()
+    # Carry context variables (e.g. the route being rendered) into the worker thread
+    context = contextvars.copy_context()
+    future = loop.run_in_executor(get_executor(), partial(context.run, func, *args, **kwargs))
+    return await asyncio.wait_for(future, timeout if timeout is not None else DB_CALL_TIMEOUT)
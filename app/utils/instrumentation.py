@@ -0,0 +1,160 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, TYPE_CHECKING
+
+from app.utils.metrics import counter, histogram
+
+if TYPE_CHECKING:
+    import flet as ft
+
+# Set CLEARANCE_DEBUG_OVERLAY=1 to show per-navigation stats in the corner of the page
+DEBUG_OVERLAY = os.environ.get("CLEARANCE_DEBUG_OVERLAY", "0") == "1"
+
+route_render_seconds = histogram("route_render_seconds", "Time spent in route_change per route", ("route",))
+route_queries_total = counter("route_queries_total", "Backend queries issued while rendering a route", ("route",))
+route_bytes_total = counter("route_bytes_total", "Approximate backend response bytes per route", ("route",))
+route_updates_total = counter("route_page_updates_total", "page.update() calls while rendering a route", ("route",))
+
+
+@dataclass
+class RouteStats:
+    route: str
+    started: float = field(default_factory=time.perf_counter)
+    duration: float = 0.0
+    queries: int = 0
+    bytes: int = 0
+    updates: int = 0
+    # Per-query records, only collected while query tracing is on
+    trace: list = field(default_factory=list)
+
+
+# Stats of the navigation currently being rendered, if any. run_db copies the
+# context into its worker threads so queries are attributed to the right route.
+current_route: contextvars.ContextVar[RouteStats | None] = contextvars.ContextVar("current_route", default=None)
+
+# run_db worker threads of one navigation update the same RouteStats
+_stats_lock = threading.Lock()
+
+RouteObserver = Callable[["ft.Page", RouteStats], None]
+_observers: list[RouteObserver] = []
+
+
+KNOWN_ROUTES = {"/", "/login", "/signup", "/home", "/profile", "/progress", "/account_settings", "/review"}
+
+
+def route_label(route: str) -> str:
+    """
+    Collapses parameterised and unknown routes so metrics have a bounded set of labels.
+    """
+    if route.startswith("/department/"):
+        return "/department/{name}"
+    if route.startswith("/review/"):
+        return "/review/{department}"
+    return route if route in KNOWN_ROUTES else "other"
+
+
+def add_route_observer(observer: RouteObserver):
+    _observers.append(observer)
+
+
+def remove_route_observer(observer: RouteObserver):
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+def record_query(data):
+    """
+    Counts one backend query against the route being rendered.
+    """
+    stats = current_route.get()
+    if stats is None:
+        return
+    size = len(json.dumps(data, default=str)) if data else 0
+    with _stats_lock:
+        stats.queries += 1
+        stats.bytes += size
+
+
+def untracked(func: Callable, *args, **kwargs):
+    """
+    Calls `func` outside the route being rendered, so background work it
+    starts (e.g. page.run_task) is not charged to that route.
+    """
+    context = contextvars.copy_context()
+    context.run(current_route.set, None)
+    return context.run(func, *args, **kwargs)
+
+
+def instrument_page(page: "ft.Page"):
+    """
+    Wraps page.update() so calls made while rendering a route are counted.
+    """
+    update = page.update
+
+    def counted_update(*controls):
+        stats = current_route.get()
+        if stats is not None:
+            with _stats_lock:
+                stats.updates += 1
+        return update(*controls)
+
+    page.update = counted_update
+
+
+@contextmanager
+def track_route(page: "ft.Page", route: str):
+    stats = RouteStats(route=route_label(route))
+    token = current_route.set(stats)
+    try:
+        yield stats
+    finally:
+        current_route.reset(token)
+        stats.duration = time.perf_counter() - stats.started
+        for observer in list(_observers):
+            try:
+                observer(page, stats)
+            except Exception as e:
+                print(f"Route observer failed: {e}")
+
+
+def _export_metrics(page: "ft.Page", stats: RouteStats):
+    route_render_seconds.observe(stats.duration, route=stats.route)
+    route_queries_total.inc(stats.queries, route=stats.route)
+    route_bytes_total.inc(stats.bytes, route=stats.route)
+    route_updates_total.inc(stats.updates, route=stats.route)
+
+
+def _show_overlay(page: "ft.Page", stats: RouteStats):
+    import flet as ft
+    from app.utils.updates import request_update
+
+    text = (
+        f"{stats.route}  {stats.duration * 1000:.0f} ms · {stats.queries} queries · "
+        f"{stats.bytes / 1024:.1f} KB · {stats.updates} updates"
+    )
+    overlay = page.session.get("debug_overlay")
+    if overlay is None:
+        overlay = ft.Container(
+            content=ft.Text(text, size=11, color=ft.Colors.WHITE),
+            bgcolor=ft.colors.with_opacity(0.7, ft.Colors.BLACK),
+            padding=6,
+            border_radius=6,
+            right=8,
+            top=8
+        )
+        page.session.set("debug_overlay", overlay)
+        page.overlay.append(overlay)
+    else:
+        overlay.content.value = text
+    # Shares the update the route itself is about to send
+    request_update(page)
+
+
+add_route_observer(_export_metrics)
+if DEBUG_OVERLAY:
+    add_route_observer(_show_overlay)
@@ -0,0 +1,72 @@
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from app.utils.instrumentation import add_route_observer, current_route
+
+# Off by default; when off the data layer only pays for one boolean check per query.
+# Turn on with CLEARANCE_QUERY_TRACE=1 or set_tracing(True) at runtime.
+_enabled = os.environ.get("CLEARANCE_QUERY_TRACE", "0") == "1"
+
+# The same query shape with different filter values this many times in one
+# navigation is reported as an N+1 pattern
+N_PLUS_ONE_THRESHOLD = 3
+
+_FILTER_VALUE = re.compile(r"=(eq|neq|gt|gte|lt|lte|like|ilike|in|is)\.[^&]*")
+
+
+@dataclass(frozen=True)
+class QueryRecord:
+    target: str
+    params: str
+    duration: float
+    rows: int
+
+
+def tracing_enabled() -> bool:
+    return _enabled
+
+
+def set_tracing(enabled: bool):
+    global _enabled
+    _enabled = enabled
+
+
+def trace_query(target: str, params: str, duration: float, rows: int):
+    stats = current_route.get()
+    route = stats.route if stats else "-"
+    print(f"[query] {route} {target} {params} {duration * 1000:.1f}ms rows={rows}")
+    if stats is not None:
+        stats.trace.append(QueryRecord(target, params, duration, rows))
+
+
+def query_shape(params: str) -> str:
+    """
+    The query with filter values blanked out, e.g. "id=eq.?&select=name".
+    """
+    return _FILTER_VALUE.sub(lambda m: f"={m.group(1)}.?", params)
+
+
+def find_patterns(records: list[QueryRecord]) -> tuple[list, list]:
+    """
+    Returns ([(target, params, count)] duplicates, [(target, shape, count)] N+1 patterns).
+    """
+    issued = Counter((r.target, r.params) for r in records)
+    duplicates = [(target, params, n) for (target, params), n in issued.items() if n > 1]
+    shapes = Counter((target, query_shape(params)) for target, params in issued)
+    n_plus_one = [(target, shape, n) for (target, shape), n in shapes.items() if n >= N_PLUS_ONE_THRESHOLD]
+    return duplicates, n_plus_one
+
+
+def _report_patterns(page, stats):
+    if not stats.trace:
+        return
+    duplicates, n_plus_one = find_patterns(stats.trace)
+    for target, params, n in duplicates:
+        print(f"[query] {stats.route}: duplicate query {target} {params} issued {n} times")
+    for target, shape, n in n_plus_one:
+        print(f"[query] {stats.route}: possible N+1, {n} queries shaped {target} {shape}")
+
+
+add_route_observer(_report_patterns)
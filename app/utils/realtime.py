@@ -0,0 +1,240 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import flet as ft
+
+from app.utils.metrics import counter, gauge
+
+# One realtime socket is shared by the whole server process. Each user with at
+# least one connected session gets one channel per table, joined with a
+# server-side `user_id=eq.<id>` filter so only that user's rows are sent to us.
+# Events are then fanned out in-process to every session of that user.
+
+realtime_channels = gauge("realtime_channels", "Realtime channels currently joined", ("table",))
+realtime_subscribers = gauge("realtime_subscribers", "Session subscriptions to realtime channels", ("table",))
+realtime_events_total = counter("realtime_events_total", "Realtime change events received", ("table",))
+
+
+@dataclass(frozen=True)
+class Change:
+    table: str
+    type: str
+    record: dict
+    old_record: dict
+
+
+def _as_change(table: str, payload: dict) -> Change:
+    # realtime-py wraps the change in {"data": {...}, "ids": [...]}
+    data = payload.get("data", payload)
+    return Change(
+        table=data.get("table", table),
+        type=(data.get("type") or data.get("eventType") or "").upper(),
+        record=data.get("record") or data.get("new") or {},
+        old_record=data.get("old_record") or data.get("old") or {}
+    )
+
+
+ChangeCallback = Callable[[Change], Any]
+
+
+@dataclass(eq=False)
+class Subscription:
+    table: str
+    user_id: str | None
+    callback: ChangeCallback
+
+
+@dataclass(eq=False)
+class _Topic:
+    channel: Any = None
+    subscribers: list[Subscription] = field(default_factory=list)
+
+
+class RealtimeHub:
+    """
+    Multiplexes every session's realtime subscriptions over one connection.
+    All channel bookkeeping happens on the event loop the hub was started on;
+    subscriptions can be released from any thread.
+    """
+    def __init__(self):
+        self._client = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._topics: dict[tuple[str, str | None], _Topic] = {}
+
+    async def _connect(self):
+        # Callers hold self._lock
+        if self._client is None:
+            from app.utils.supabase_config import create_realtime_client
+            client = create_realtime_client()
+            await client.connect()
+            self._client = client
+        return self._client
+
+    async def subscribe(self, table: str, user_id: str | None, callback: ChangeCallback) -> Subscription:
+        """
+        Subscribes to one user's changes on `table`, or to every change when
+        `user_id` is None.
+        """
+        if self._lock is None:
+            self._loop = asyncio.get_running_loop()
+            self._lock = asyncio.Lock()
+        subscription = Subscription(table, user_id, callback)
+        key = (table, user_id)
+        async with self._lock:
+            client = await self._connect()
+            topic = self._topics.get(key)
+            if topic is None:
+                channel = client.channel(f"{table}:{user_id or '*'}")
+                channel.on_postgres_changes(
+                    "*",
+                    table=table,
+                    schema="public",
+                    filter=f"user_id=eq.{user_id}" if user_id is not None else None,
+                    callback=lambda payload: self._dispatch(key, payload)
+                )
+                await channel.subscribe()
+                topic = self._topics[key] = _Topic(channel=channel)
+                realtime_channels.inc(table=table)
+            topic.subscribers.append(subscription)
+            realtime_subscribers.inc(table=table)
+        return subscription
+
+    async def _leave(self, subscription: Subscription):
+        key = (subscription.table, subscription.user_id)
+        async with self._lock:
+            topic = self._topics.get(key)
+            if topic is None or subscription not in topic.subscribers:
+                return
+            topic.subscribers.remove(subscription)
+            realtime_subscribers.dec(table=subscription.table)
+            if topic.subscribers:
+                return
+            # Last session of this user is gone, so stop the server sending its rows
+            del self._topics[key]
+            realtime_channels.dec(table=subscription.table)
+            try:
+                await self._client.remove_channel(topic.channel)
+            except Exception as e:
+                print(f"Failed to leave realtime channel {key}: {e}")
+
+    def unsubscribe(self, subscription: Subscription):
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._loop.create_task(self._leave(subscription))
+        else:
+            asyncio.run_coroutine_threadsafe(self._leave(subscription), self._loop)
+
+    def _dispatch(self, key: tuple[str, str | None], payload: dict):
+        # The socket may deliver on another thread (the local backend does)
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._fan_out, key, payload)
+
+    def _fan_out(self, key: tuple[str, str | None], payload: dict):
+        topic = self._topics.get(key)
+        if topic is None:
+            return
+        change = _as_change(key[0], payload)
+        realtime_events_total.inc(table=key[0])
+        for subscription in list(topic.subscribers):
+            try:
+                result = subscription.callback(change)
+                # Async callbacks can go to the database without blocking the fan-out
+                if asyncio.iscoroutine(result):
+                    self._loop.create_task(result)
+            except Exception as e:
+                print(f"Realtime subscriber failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self._topics),
+            "subscribers": sum(len(t.subscribers) for t in self._topics.values())
+        }
+
+    async def close(self):
+        if self._client is None:
+            return
+        async with self._lock:
+            for (table, _), topic in self._topics.items():
+                realtime_channels.dec(table=table)
+                realtime_subscribers.dec(len(topic.subscribers), table=table)
+            self._topics.clear()
+        await self._client.close()
+        self._client = None
+
+
+hub = RealtimeHub()
+
+
+# Process-wide subscriptions to shared tables, by table
+_process_subscriptions: dict[str, Subscription] = {}
+
+
+async def subscribe_process(table: str, callback: ChangeCallback):
+    """
+    Subscribes the server process to every change on a shared table, once.
+    """
+    if table in _process_subscriptions:
+        return
+    pending = _process_subscriptions[table] = Subscription(table, None, callback)
+    try:
+        _process_subscriptions[table] = await hub.subscribe(table, None, callback)
+    except Exception as e:
+        if _process_subscriptions.get(table) is pending:
+            del _process_subscriptions[table]
+        print(f"Realtime subscription to {table} failed: {e}")
+
+
+async def subscribe_page(page: ft.Page, table: str, callback: ChangeCallback) -> bool:
+    """
+    Subscribes a session to its own user's changes on `table`. Calling it again
+    for the same user and table is a no-op; a different user replaces the old
+    subscription. Returns True when a new subscription was made, i.e. when
+    changes may have been missed since the session last listened.
+    """
+    user_id = page.session.get("user_id")
+    if not user_id:
+        return False
+    subscriptions = page.session.get("realtime_subscriptions")
+    if subscriptions is None:
+        subscriptions = {}
+        page.session.set("realtime_subscriptions", subscriptions)
+    existing = subscriptions.get(table)
+    if existing is not None:
+        if existing.user_id == user_id:
+            return False
+        hub.unsubscribe(existing)
+    # Placeholder so a second navigation during the join does not subscribe twice
+    pending = subscriptions[table] = Subscription(table, user_id, callback)
+    try:
+        subscription = await hub.subscribe(table, user_id, callback)
+    except Exception as e:
+        if subscriptions.get(table) is pending:
+            del subscriptions[table]
+        print(f"Realtime subscription to {table} failed: {e}")
+        return False
+    if subscriptions.get(table) is pending and page.session.get("realtime_subscriptions") is subscriptions:
+        subscriptions[table] = subscription
+        return True
+    # Released or replaced while joining
+    hub.unsubscribe(subscription)
+    return False
+
+
+def release_page(page: ft.Page):
+    """
+    Drops every realtime subscription held by a session, e.g. on logout or disconnect.
+    """
+    subscriptions = page.session.get("realtime_subscriptions")
+    if not subscriptions:
+        return
+    page.session.remove("realtime_subscriptions")
+    for subscription in subscriptions.values():
+        hub.unsubscribe(subscription)
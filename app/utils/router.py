@@ -0,0 +1,89 @@
+import flet as ft
+
+from app.components.bottom_nav import NAV_ROUTES, create_bottom_nav
+
+AUTH_ROUTES = ["/", "/login", "/signup"]
+
+
+def parent_route(route: str) -> str | None:
+    """
+    The route a screen is stacked on top of, or None for top-level screens.
+    """
+    if route.startswith("/department/"):
+        return "/home"
+    if route == "/account_settings":
+        return "/profile"
+    if route.startswith("/review/"):
+        return "/review"
+    return None
+
+
+class ViewStack:
+    """
+    Keeps each session's page.views as a stack of persistent views: top-level
+    routes replace the stack, sub-screens are pushed above their parent, and
+    going back pops to a view that is already built. One bottom navigation bar
+    is shared by every view and moved to whichever view is on top.
+    """
+    def __init__(self, page: ft.Page):
+        self.page = page
+        self.nav = create_bottom_nav(page)
+
+    def routes(self) -> list[str]:
+        return [view.route for view in self.page.views]
+
+    def go_back_to(self, route: str) -> bool:
+        """
+        Pops views until `route` is on top. Returns False if it is not on the stack.
+        """
+        routes = self.routes()
+        if route not in routes:
+            return False
+        del self.page.views[routes.index(route) + 1:]
+        self._place_nav()
+        return True
+
+    def discard(self, route: str):
+        """
+        Drops a stacked view whose data changed, so the next visit rebuilds it.
+        """
+        routes = self.routes()
+        if route in routes:
+            del self.page.views[routes.index(route)]
+            self._place_nav()
+
+    def show(self, view: ft.View):
+        parent = parent_route(view.route)
+        views = self.page.views
+        if parent is not None and views and views[0].route == parent:
+            del views[1:]
+        else:
+            views.clear()
+        views.append(view)
+        self._place_nav()
+
+    def pop(self) -> str | None:
+        if len(self.page.views) > 1:
+            self.page.views.pop()
+            self._place_nav()
+        return self.page.views[-1].route if self.page.views else None
+
+    def _place_nav(self):
+        views = self.page.views
+        for view in views:
+            view.navigation_bar = None
+        if not views or views[-1].route in AUTH_ROUTES:
+            return
+        top = views[-1].route
+        tab = parent_route(top) or top
+        if tab in NAV_ROUTES:
+            self.nav.selected_index = NAV_ROUTES.index(tab)
+        views[-1].navigation_bar = self.nav
+
+
+def get_view_stack(page: ft.Page) -> ViewStack:
+    stack = page.session.get("view_stack")
+    if stack is None:
+        stack = ViewStack(page)
+        page.session.set("view_stack", stack)
+    return stack
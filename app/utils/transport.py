@@ -0,0 +1,81 @@
+import importlib.util
+import os
+import threading
+
+import httpx
+
+from app.utils.metrics import counter, gauge
+from app.utils.supabase_config import QUERY_TIMEOUT
+
+# One pooled HTTP client is shared by every session, so bursts of requests
+# reuse warm keep-alive connections instead of repeating TLS handshakes
+HTTP_POOL_SIZE = int(os.environ.get("CLEARANCE_HTTP_POOL_SIZE", "32"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("CLEARANCE_HTTP_MAX_KEEPALIVE", "16"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("CLEARANCE_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("CLEARANCE_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.environ.get("CLEARANCE_HTTP_READ_TIMEOUT", str(QUERY_TIMEOUT)))
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2 = os.environ.get("CLEARANCE_HTTP2", "1") != "0" and importlib.util.find_spec("h2") is not None
+
+requests_in_flight = gauge("http_requests_in_flight", "HTTP requests currently using the backend connection pool")
+requests_peak = gauge("http_requests_in_flight_peak", "Highest number of concurrent backend HTTP requests seen")
+requests_total = counter("http_requests_total", "Backend HTTP requests sent")
+pool_saturated_total = counter(
+    "http_pool_saturated_total",
+    "Backend HTTP requests that had to wait because every pooled connection was busy"
+)
+
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+def _started():
+    global _in_flight
+    with _in_flight_lock:
+        if _in_flight >= HTTP_POOL_SIZE:
+            pool_saturated_total.inc()
+        _in_flight += 1
+        requests_in_flight.set(_in_flight)
+        if _in_flight > requests_peak.value():
+            requests_peak.set(_in_flight)
+    requests_total.inc()
+
+
+def _finished():
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight -= 1
+        requests_in_flight.set(_in_flight)
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        _started()
+        try:
+            return super().handle_request(request)
+        finally:
+            _finished()
+
+
+def create_http_client() -> httpx.Client:
+    limits = httpx.Limits(
+        max_connections=HTTP_POOL_SIZE,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+    return httpx.Client(
+        transport=InstrumentedTransport(http2=HTTP2, limits=limits),
+        timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        follow_redirects=True
+    )
+
+
+def pool_stats() -> dict:
+    return {
+        "pool_size": HTTP_POOL_SIZE,
+        "http2": HTTP2,
+        "in_flight": _in_flight,
+        "peak_in_flight": requests_peak.value(),
+        "requests": requests_total.value(),
+        "saturated": pool_saturated_total.value()
+    }
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+
+import flet as ft
+
+from app.utils.metrics import counter
+
+updates_requested = counter("page_updates_requested_total", "page updates requested by screens and handlers")
+updates_sent = counter("page_updates_sent_total", "page updates actually sent to the client")
+
+
+class UpdateBatcher:
+    """
+    Coalesces update requests for one page. Requests made on the event loop are
+    merged into a single page.update() at the end of the current loop turn;
+    requests inside batch() are merged into one update when the block exits.
+    """
+    def __init__(self, page: ft.Page):
+        self.page = page
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._pending = False
+        self._scheduled = False
+
+    def request(self):
+        updates_requested.inc()
+        with self._lock:
+            self._pending = True
+            if self._depth > 0 or self._scheduled:
+                return
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                self._scheduled = True
+                loop.call_soon(self.flush)
+                return
+        # Sync handlers run on worker threads with no loop to defer to
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._scheduled = False
+            if not self._pending or self._depth > 0:
+                return
+            self._pending = False
+        updates_sent.inc()
+        self.page.update()
+
+    @contextmanager
+    def batch(self):
+        with self._lock:
+            self._depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+            self.flush()
+
+
+def get_update_batcher(page: ft.Page) -> UpdateBatcher:
+    batcher = page.session.get("update_batcher")
+    if batcher is None:
+        batcher = UpdateBatcher(page)
+        page.session.set("update_batcher", batcher)
+    return batcher
+
+
+def request_update(page: ft.Page):
+    """
+    Asks for the page to be sent to the client; calls in the same loop turn or
+    batch() block share one update.
+    """
+    get_update_batcher(page).request()
+
+
+@contextmanager
+def batch_updates(page: ft.Page):
+    with get_update_batcher(page).batch():
+        yield
+
+
+def update_stats() -> dict:
+    requested = updates_requested.value()
+    sent = updates_sent.value()
+    return {"requested": requested, "sent": sent, "saved": requested - sent}
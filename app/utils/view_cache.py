@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import flet as ft
+
+# Routes remembered per session; older entries are rebuilt on their next visit
+VIEW_CACHE_SIZE = 8
+
+
+class ViewCache:
+    """
+    Per-session cache of built views, keyed by route and the version of the
+    data they were built from.
+    """
+    def __init__(self, maxsize: int = VIEW_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[Hashable, Any]] = OrderedDict()
+
+    def get(self, key: str, version: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, version: Hashable, value: Any):
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str | None = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+def get_view_cache(page: ft.Page) -> ViewCache:
+    cache = page.session.get("view_cache")
+    if cache is None:
+        cache = ViewCache()
+        page.session.set("view_cache", cache)
+    return cache
+
+
+def cached_view(page: ft.Page, key: str, version: Hashable, build: Callable[[], ft.View]) -> ft.View:
+    """
+    Returns the view built for `key` at `version`, building it only when the
+    route has not been rendered yet or its data changed since.
+    """
+    cache = get_view_cache(page)
+    view = cache.get(key, version)
+    if view is None:
+        view = build()
+        cache.put(key, version, view)
+    return view
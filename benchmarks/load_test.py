@@ -0,0 +1,272 @@
+# Headless load test for the Flet app.
+#
+# Runs N simulated student sessions concurrently against main(page) using a fake
+# ft.Page and the in-process local backend, walks login -> /home ->
+# /department/<name> -> submit -> /progress, and prints per-route latency
+# percentiles and throughput as JSON.
+#
+#   python benchmarks/load_test.py --sessions 100 --latency-ms 20 --output bench.json
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+# Keep benchmark runs from leaving queued writes in the real outbox file
+os.environ.setdefault("CLEARANCE_OUTBOX_PATH", ":memory:")
+
+import flet as ft
+
+from app.data.local_backend import SEED_DEPARTMENTS, create_local_client
+from app.utils.instrumentation import add_route_observer, route_label
+from app.utils.supabase_config import use_backend
+
+PASSWORD = "benchmark-password"
+
+
+class FakeSession:
+    def __init__(self):
+        self._values = {}
+
+    def get(self, key):
+        return self._values.get(key)
+
+    def set(self, key, value):
+        self._values[key] = value
+
+    def remove(self, key):
+        self._values.pop(key, None)
+
+    def contains_key(self, key):
+        return key in self._values
+
+    def clear(self):
+        self._values.clear()
+
+
+class FakePage:
+    """
+    Just enough of ft.Page for the screens to render without a Flet server.
+    Navigation is queued by go() and run by drain(), so the driver can time it.
+    """
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.session = FakeSession()
+        self.controls = []
+        self.views = [ft.View()]
+        self.route = "/"
+        self.window_width = 375
+        self.window_height = 800
+        self.snack_bar = None
+        self.dialog = None
+        self.overlay = []
+        self.on_route_change = None
+        self.on_view_pop = None
+        self.on_disconnect = None
+        self.update_count = 0
+        self._pending_routes = []
+        self._tasks = []
+
+    def __getattr__(self, name):
+        # Any other page property the app sets or reads (theme, fonts, scroll...)
+        return None
+
+    def add(self, *controls):
+        self.controls.extend(controls)
+
+    def clean(self):
+        self.controls.clear()
+
+    def update(self, *_):
+        self.update_count += 1
+
+    def open(self, control):
+        control.open = True
+
+    def close(self, control):
+        control.open = False
+
+    def launch_url(self, *_, **__):
+        pass
+
+    def go(self, route, **_):
+        self._pending_routes.append(route)
+
+    def run_task(self, handler, *args, **kwargs):
+        task = asyncio.get_running_loop().create_task(handler(*args, **kwargs))
+        self._tasks.append(task)
+        return task
+
+    async def drain(self, timings: dict | None = None):
+        """
+        Runs queued navigations and background tasks, recording how long each
+        route_change took.
+        """
+        while self._pending_routes or self._tasks:
+            if self._pending_routes:
+                route = self._pending_routes.pop(0)
+                self.route = route
+                started = time.perf_counter()
+                await self.on_route_change(SimpleNamespace(route=route, page=self))
+                if timings is not None:
+                    timings.setdefault(route_label(route), []).append(time.perf_counter() - started)
+            else:
+                tasks, self._tasks = self._tasks, []
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def iter_controls(control):
+    yield control
+    for attribute in ("content", "controls", "actions", "destinations"):
+        children = getattr(control, attribute, None)
+        if children is None:
+            continue
+        for child in children if isinstance(children, list) else [children]:
+            if isinstance(child, ft.Control):
+                yield from iter_controls(child)
+
+
+def all_controls(page: FakePage):
+    roots = list(page.controls)
+    for view in page.views:
+        roots.extend(view.controls or [])
+        if view.navigation_bar:
+            roots.append(view.navigation_bar)
+    for root in roots:
+        yield from iter_controls(root)
+
+
+def find(page: FakePage, kind, **attributes):
+    for control in all_controls(page):
+        if isinstance(control, kind) and all(getattr(control, k, None) == v for k, v in attributes.items()):
+            return control
+    raise LookupError(f"No {kind.__name__} with {attributes} on {page.route}")
+
+
+async def click(page: FakePage, button):
+    result = button.on_click(SimpleNamespace(control=button, page=page, data=None))
+    if asyncio.iscoroutine(result):
+        await result
+
+
+async def run_session(index: int, main, backend, timings: dict, errors: list):
+    page = FakePage(session_id=f"bench-{index}")
+    email = f"student{index}@bench.local"
+    department = SEED_DEPARTMENTS[index % len(SEED_DEPARTMENTS)]
+    try:
+        main(page)
+        await page.drain()
+
+        # Login -> /home
+        find(page, ft.TextField, label="Email").value = email
+        find(page, ft.TextField, label="Password").value = PASSWORD
+        await click(page, find(page, ft.ElevatedButton, text="Sign In"))
+        await page.drain(timings)
+
+        # /department/<name> -> submit
+        page.go(f"/department/{department}")
+        await page.drain(timings)
+        for control in all_controls(page):
+            if isinstance(control, ft.Dropdown):
+                control.value = control.options[0].key
+            elif isinstance(control, ft.TextField):
+                control.value = "benchmark"
+        started = time.perf_counter()
+        await click(page, find(page, ft.ElevatedButton, text="Submit Form"))
+        timings.setdefault("submit", []).append(time.perf_counter() - started)
+        await page.drain(timings)
+
+        # /progress
+        page.go("/progress")
+        await page.drain(timings)
+    except Exception as e:
+        errors.append(f"session {index}: {type(e).__name__}: {e}")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(timings: dict, route_stats: dict) -> dict:
+    summary = {}
+    for route, samples in sorted(timings.items()):
+        summary[route] = {
+            "count": len(samples),
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+            "max_ms": round(max(samples) * 1000, 3),
+        }
+        stats = route_stats.get(route)
+        if stats:
+            summary[route].update({
+                "queries_per_render": round(sum(s.queries for s in stats) / len(stats), 3),
+                "bytes_per_render": round(sum(s.bytes for s in stats) / len(stats), 1),
+                "updates_per_render": round(sum(s.updates for s in stats) / len(stats), 3),
+            })
+    return summary
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+async def run(args) -> dict:
+    backend = create_local_client(latency_ms=args.latency_ms)
+    use_backend(backend)
+    for index in range(args.sessions):
+        backend.auth.sign_up({"email": f"student{index}@bench.local", "password": PASSWORD})
+
+    from main import main
+
+    timings, errors, route_stats = {}, [], {}
+    add_route_observer(lambda page, stats: route_stats.setdefault(stats.route, []).append(stats))
+    started = time.perf_counter()
+    await asyncio.gather(*(run_session(i, main, backend, timings, errors) for i in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+
+    navigations = sum(len(samples) for samples in timings.values())
+    return {
+        "commit": current_commit(),
+        "sessions": args.sessions,
+        "latency_ms": args.latency_ms,
+        "elapsed_s": round(elapsed, 3),
+        "throughput": {
+            "sessions_per_s": round(args.sessions / elapsed, 3),
+            "operations_per_s": round(navigations / elapsed, 3),
+        },
+        "routes": summarize(timings, route_stats),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent headless sessions against main(page)")
+    parser.add_argument("--sessions", type=int, default=50, help="number of simulated students")
+    parser.add_argument("--latency-ms", type=float, default=10, help="simulated backend round-trip time")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    sys.exit(1 if report["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,27 @@ import flet as ft
 import threading
 from app.screens.home_screen import home_screen
 from app.screens.profile import profile_page
-from app.screens.progress import progress_page
+from app.screens.progress import progress_page, refresh_progress_view
 from app.screens.account_settings import account_settings_page
 from app.screens.department_form import department_form_page
-from app.components.bottom_nav import create_bottom_nav
-from app.utils.supabase_config import supabase
+from app.screens.review import is_reviewer, review_index_page, review_page
+from app.data.clearance_status import (
+    apply_request_change,
+    fetch_clearance_status,
+    invalidate_clearance_status,
+    invalidate_department_data
+)
+from app.data.outbox import get_outbox
+from app.data.students import create_student
+from app.utils.instrumentation import instrument_page, track_route, untracked
+from app.utils.metrics import start_metrics_server
+from app.utils.supabase_config import get_supabase, warmup
+from app.utils.executor import run_db
+from app.utils.realtime import release_page, subscribe_page, subscribe_process
+from app.utils.router import AUTH_ROUTES, get_view_stack
+from app.utils.updates import batch_updates, request_update
+import os
 import asyncio
-from datetime import datetime
 
 def main(page: ft.Page):
     # Set page properties
@@ -60,24 +74,33 @@ def main(page: ft.Page):
             duration=5000,
         )
         page.snack_bar.open = True
-        page.update()
-
-    def get_selected_index(route: str) -> int:
-        return {
-            "/home": 0,
-            "/progress": 1,
-            "/profile": 2,
-            "/account_settings": 3
-        }.get(route, 0)
+        request_update(page)
 
     # --- Real-Time Updates ---
-    def listen_for_updates():
-        def callback(payload):
-            if payload.event_type == "INSERT":
-                notification = payload.new
-                if notification["user_id"] == page.session.get("user_id"):
-                    show_snackbar(page, notification["message"], ft.Colors.BLUE_600)
-        supabase.realtime.from_("Notifications").on("INSERT", callback).subscribe()
+    async def listen_for_updates():
+        # Runs in the background after login, so a slow realtime connection never delays a screen
+        user_id = page.session.get("user_id")
+        if not user_id:
+            return
+
+        # The server only sends this user's rows; the shared hub routes them here
+        def on_notification(change):
+            if change.type == "INSERT":
+                show_snackbar(page, change.record["message"], ft.Colors.BLUE_600)
+
+        # Reviewer decisions patch the cached status and the open progress view
+        async def on_request_change(change):
+            await run_db(apply_request_change, user_id, change.type, change.record)
+            await refresh_progress_view(page)
+
+        try:
+            await subscribe_page(page, "notifications", on_notification)
+            if await subscribe_page(page, "clearancerequests", on_request_change):
+                # Changes made while nobody was listening for this user were never seen
+                invalidate_clearance_status(user_id)
+            await subscribe_process("departments", lambda _: invalidate_department_data())
+        except Exception as e:
+            print(f"Realtime subscription failed: {e}")
 
     # --- UI Screens ---
     def login_screen():
@@ -106,26 +129,29 @@ def main(page: ft.Page):
         )
 
         def sign_in(e):
-            email = email_field.value
-            password = password_field.value
-            
-            if not all([email, password]):
-                show_snackbar(page, "Please fill in all fields")
-                return
+            # One update for everything this handler changes
+            with batch_updates(page):
+                email = email_field.value
+                password = password_field.value
 
-            try:
-                user = supabase.auth.sign_in_with_password({"email": email, "password": password})
-                if not user.user.email_confirmed_at:
-                    show_snackbar(page, "Please verify your email before logging in.", ft.Colors.ORANGE)
+                if not all([email, password]):
+                    show_snackbar(page, "Please fill in all fields")
                     return
-                page.session.set("user_id", user.user.id)
-                page.session.set("user_email", email)
-                show_snackbar(page, "Login successful!", ft.Colors.GREEN_600)
-                page.update()
-                page.go("/home")
-            except Exception as e:
-                show_snackbar(page, f"Login failed: {str(e)}")
-                page.update()
+
+                try:
+                    user = get_supabase().auth.sign_in_with_password({"email": email, "password": password})
+                    if not user.user.email_confirmed_at:
+                        show_snackbar(page, "Please verify your email before logging in.", ft.Colors.ORANGE)
+                        return
+                    page.session.set("user_id", user.user.id)
+                    page.session.set("user_email", email)
+                    page.run_task(listen_for_updates)
+                    show_snackbar(page, "Login successful!", ft.Colors.GREEN_600)
+                    request_update(page)
+                    page.go("/home")
+                except Exception as e:
+                    show_snackbar(page, f"Login failed: {str(e)}")
+                    request_update(page)
 
         sign_in_button = ft.ElevatedButton(
             "Sign In",
@@ -225,42 +251,35 @@ def main(page: ft.Page):
         error_display = ft.Text("", color=ft.Colors.RED_600, size=16, visible=False)
 
         def sign_up(e):
-            full_name = full_name_field.value
-            email = email_field.value
-            student_id = reg_number_field.value
-            password = password_field.value
+            # One update for everything this handler changes
+            with batch_updates(page):
+                full_name = full_name_field.value
+                email = email_field.value
+                student_id = reg_number_field.value
+                password = password_field.value
 
-            if not all([full_name, email, student_id, password]):
-                show_snackbar(page, "Please fill in all fields")
-                return
+                if not all([full_name, email, student_id, password]):
+                    show_snackbar(page, "Please fill in all fields")
+                    return
 
-            if len(password) < 6:
-                show_snackbar(page, "Password must be at least 6 characters")
-                return
+                if len(password) < 6:
+                    show_snackbar(page, "Password must be at least 6 characters")
+                    return
 
-            try:
-                auth_user = supabase.auth.sign_up({"email": email, "password": password})
-                if auth_user.user:
-                    user_data = {
-                        "id": auth_user.user.id,
-                        "full_name": full_name,
-                        "email": email,
-                        "student_id": student_id,
-                        "created_at": datetime.now().isoformat()
-                    }
-                    response = supabase.table("students").insert(user_data).execute()
-
-                    if response.data:
-                        show_snackbar(page, "Account created! Check email to verify", ft.Colors.GREEN_600)
-                        page.update()
-                        page.go("/login")
+                try:
+                    auth_user = get_supabase().auth.sign_up({"email": email, "password": password})
+                    if auth_user.user:
+                        if create_student(auth_user.user.id, full_name, email, student_id):
+                            show_snackbar(page, "Account created! Check email to verify", ft.Colors.GREEN_600)
+                            request_update(page)
+                            page.go("/login")
+                        else:
+                            raise Exception("Failed to create user profile")
                     else:
-                        raise Exception("Failed to create user profile")
-                else:
-                    raise Exception("Failed to create account")
-            except Exception as e:
-                show_snackbar(page, f"Signup failed: {str(e)}")
-                page.update()
+                        raise Exception("Failed to create account")
+                except Exception as e:
+                    show_snackbar(page, f"Signup failed: {str(e)}")
+                    request_update(page)
 
         sign_up_button = ft.ElevatedButton(
             "Create Account",
@@ -313,39 +332,68 @@ def main(page: ft.Page):
 
     # --- Route Handler ---
     async def route_change(e):
-        page.clean()
-        if e.route in ["/", "/login", "/signup"]:
-            if e.route in ["/", "/login"]:
-                page.add(login_screen())
-            elif e.route == "/signup":
-                page.add(signup_screen())
-        else:
-            if not page.session.get("user_id"):
-                page.go("/")
+        with track_route(page, e.route), batch_updates(page):
+            stack = get_view_stack(page)
+
+            # Going back to a screen that is still on the stack pops to it without rebuilding
+            if stack.go_back_to(e.route):
+                request_update(page)
                 return
 
-            if e.route == "/home":
-                home_screen(page)
-            elif e.route == "/profile":
-                profile_page(page)
-            elif e.route == "/progress":
-                await progress_page(page)
-            elif e.route.startswith("/department/"):
-                dept_name = e.route.split("/")[-1]
-                print(f"Route department name: {dept_name}")
-                department_form_page(page, dept_name)
-            elif e.route == "/account_settings":
-                account_settings_page(page)
-
-            page.add(create_bottom_nav(page, get_selected_index(e.route)))
-        page.update()
+            if e.route in AUTH_ROUTES:
+                if e.route == "/signup":
+                    view = ft.View("/signup", [signup_screen()])
+                else:
+                    view = ft.View(e.route, [login_screen()])
+                view.vertical_alignment = ft.MainAxisAlignment.CENTER
+                view.horizontal_alignment = ft.CrossAxisAlignment.CENTER
+                view.bgcolor = ft.Colors.WHITE
+            else:
+                if not page.session.get("user_id"):
+                    page.go("/")
+                    return
+
+                if e.route == "/home":
+                    view = home_screen(page)
+                    # Warm the status map so department forms open without a query;
+                    # it finishes after this render, so it is not counted against /home
+                    untracked(page.run_task, fetch_clearance_status, page.session.get("user_id"))
+                elif e.route == "/profile":
+                    view = await profile_page(page)
+                elif e.route == "/progress":
+                    view = await progress_page(page)
+                elif e.route.startswith("/department/"):
+                    dept_name = e.route.split("/")[-1]
+                    view = await department_form_page(page, dept_name)
+                elif e.route == "/account_settings":
+                    view = account_settings_page(page)
+                elif e.route == "/review" or e.route.startswith("/review/"):
+                    if not await is_reviewer(page):
+                        page.go("/home")
+                        return
+                    if e.route == "/review":
+                        view = await review_index_page(page)
+                    else:
+                        view = await review_page(page, e.route.split("/")[-1])
+                else:
+                    page.go("/home")
+                    return
+
+            stack.show(view)
+            request_update(page)
+
+    def view_pop(e):
+        route = get_view_stack(page).pop()
+        if route:
+            page.go(route)
 
     # Initial setup
     def initialize():
         try:
-            session = supabase.auth.get_session()
+            session = get_supabase().auth.get_session()
             if session and session.user.email_confirmed_at:
                 page.session.set("user_id", session.user.id)
+                page.run_task(listen_for_updates)
                 page.go("/home")
             else:
                 page.go("/")
@@ -354,9 +402,21 @@ def main(page: ft.Page):
             page.go("/")
 
     # Set up route handler
+    instrument_page(page)
     page.on_route_change = route_change
-    page.on_view_pop = lambda _: page.go(page.route)
+    page.on_view_pop = view_pop
+    # Leave realtime channels as soon as the browser goes away
+    page.on_disconnect = lambda _: release_page(page)
+    page.on_close = lambda _: release_page(page)
+    page.on_connect = lambda _: page.run_task(listen_for_updates)
+    # Open the database connection in the background instead of at import time
+    page.run_task(warmup)
     initialize()
 
 if __name__ == "__main__":
+    # Prometheus scrape endpoint for route, query and connection pool metrics
+    if os.environ.get("CLEARANCE_METRICS_PORT"):
+        start_metrics_server(int(os.environ["CLEARANCE_METRICS_PORT"]))
+    # Send writes left in the outbox by a previous run
+    get_outbox().start()
     ft.app(target=main, view=ft.AppView.WEB_BROWSER)
\ No newline at end of file
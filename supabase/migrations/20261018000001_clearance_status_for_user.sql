@@ -0,0 +1,37 @@
+-- Per-department clearance status for one student in a single round trip.
+-- Returns one row per department with the latest request status (null when
+-- nothing was submitted) and the student's overall completion percentage.
+
+create index if not exists clearancerequests_user_department_idx
+    on public.clearancerequests (user_id, department_id);
+
+create or replace function public.clearance_status_for_user(
+    p_user_id public.clearancerequests.user_id%type
+)
+returns table (
+    department_id public.departments.id%type,
+    department_name public.departments.name%type,
+    status public.clearancerequests.status%type,
+    completion_percentage numeric
+)
+language sql
+stable
+as $$
+    select
+        d.id,
+        d.name,
+        r.status,
+        round(100.0 * count(r.status) over () / count(*) over (), 2)
+    from public.departments d
+    left join lateral (
+        select cr.status
+        from public.clearancerequests cr
+        where cr.user_id = p_user_id
+          and cr.department_id = d.id
+        order by cr.submitted_at desc
+        limit 1
+    ) r on true
+    order by d.name;
+$$;
+
+grant execute on function public.clearance_status_for_user to anon, authenticated;
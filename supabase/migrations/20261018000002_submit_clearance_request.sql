@@ -0,0 +1,66 @@
+-- Atomic clearance submission: duplicate detection, the request insert and the
+-- student's notification happen in one transaction and one round trip.
+
+-- Keep one request per (user, department) before enforcing uniqueness: a
+-- reviewer's decision wins over a pending resubmission, then the latest row
+delete from public.clearancerequests cr
+using (
+    select id,
+           row_number() over (
+               partition by user_id, department_id
+               order by coalesce(status, 'Pending') <> 'Pending' desc, submitted_at desc nulls last, id desc
+           ) as rank
+    from public.clearancerequests
+) ranked
+where cr.id = ranked.id
+  and ranked.rank > 1;
+
+alter table public.clearancerequests
+    add constraint clearancerequests_user_department_key unique (user_id, department_id);
+
+-- The unique constraint's index covers the lookups this one served
+drop index if exists public.clearancerequests_user_department_idx;
+
+create or replace function public.submit_clearance_request(
+    p_user_id public.clearancerequests.user_id%type,
+    p_department_id public.clearancerequests.department_id%type,
+    p_form_data jsonb,
+    p_message text
+)
+returns table (
+    request_id public.clearancerequests.id%type,
+    created boolean,
+    status public.clearancerequests.status%type
+)
+language plpgsql
+as $$
+declare
+    v_id public.clearancerequests.id%type;
+begin
+    insert into public.clearancerequests (user_id, department_id, status, form_data, submitted_at)
+    values (p_user_id, p_department_id, 'Pending', p_form_data, now())
+    on conflict (user_id, department_id) do nothing
+    returning id into v_id;
+
+    -- Already submitted: report the existing request instead of failing
+    if v_id is null then
+        return query
+            select cr.id, false, cr.status
+            from public.clearancerequests cr
+            where cr.user_id = p_user_id
+              and cr.department_id = p_department_id;
+        return;
+    end if;
+
+    insert into public.notifications (user_id, message, created_at)
+    values (p_user_id, p_message, now());
+
+    -- Report the row as written, so the status is whatever the table stored
+    return query
+        select cr.id, true, cr.status
+        from public.clearancerequests cr
+        where cr.id = v_id;
+end;
+$$;
+
+grant execute on function public.submit_clearance_request to anon, authenticated;
@@ -0,0 +1,7 @@
+-- Stream notification inserts to the app's shared realtime connection. The app
+-- joins one channel per connected user with a `user_id=eq.<id>` filter, so the
+-- server only sends each process the rows of users it is serving.
+alter publication supabase_realtime add table public.notifications;
+
+-- Per-user lookups and the realtime `user_id` filter both key on this column
+create index if not exists notifications_user_id_idx on public.notifications (user_id);
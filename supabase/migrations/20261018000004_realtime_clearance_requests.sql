@@ -0,0 +1,5 @@
+-- Reviewer decisions are pushed to the student's sessions, which patch their
+-- cached clearance status instead of refetching it on every navigation.
+-- Department changes invalidate every cached status, so they are streamed too.
+alter publication supabase_realtime add table public.clearancerequests;
+alter publication supabase_realtime add table public.departments;
@@ -0,0 +1,73 @@
+-- Reviewer queue: one department's requests in a given status, oldest first,
+-- read a page at a time with keyset pagination on (submitted_at, id). Each page
+-- is an index range scan that starts where the previous page ended, so page
+-- 500 costs the same as page 1. form_data is not returned; it is fetched per
+-- request when a reviewer expands it.
+
+create index if not exists clearancerequests_review_idx
+    on public.clearancerequests (department_id, status, submitted_at, id);
+
+create or replace function public.review_queue(
+    p_department_id public.clearancerequests.department_id%type,
+    p_status public.clearancerequests.status%type default 'Pending',
+    p_after_submitted_at public.clearancerequests.submitted_at%type default null,
+    p_after_id public.clearancerequests.id%type default null,
+    p_limit integer default 50
+)
+returns table (
+    id public.clearancerequests.id%type,
+    user_id public.clearancerequests.user_id%type,
+    full_name public.students.full_name%type,
+    student_id public.students.student_id%type,
+    status public.clearancerequests.status%type,
+    submitted_at public.clearancerequests.submitted_at%type
+)
+language plpgsql
+stable
+-- Reads every student's requests regardless of row level security, so the
+-- caller's role is checked first
+security definer
+set search_path = public
+as $$
+#variable_conflict use_column
+begin
+    if coalesce((select u.role from public.users u where u.id = auth.uid()), '') not in ('reviewer', 'admin') then
+        raise exception 'Only reviewers can read the review queue' using errcode = '42501';
+    end if;
+
+    return query
+    select r.id, r.user_id, s.full_name, s.student_id, r.status, r.submitted_at
+    from public.clearancerequests r
+    left join public.students s on s.id = r.user_id
+    where r.department_id = p_department_id
+      and r.status = p_status
+      -- Row comparison keeps the whole cursor inside the index range; a null
+      -- cursor starts from the beginning
+      and (r.submitted_at, r.id) > (coalesce(p_after_submitted_at, '-infinity'), p_after_id)
+    order by r.submitted_at, r.id
+    limit least(greatest(p_limit, 1), 200);
+end;
+$$;
+
+grant execute on function public.review_queue to authenticated;
+
+-- A request's form, for reviewers expanding it in the queue
+create or replace function public.review_form_data(
+    p_request_id public.clearancerequests.id%type
+)
+returns jsonb
+language plpgsql
+stable
+security definer
+set search_path = public
+as $$
+begin
+    if coalesce((select u.role from public.users u where u.id = auth.uid()), '') not in ('reviewer', 'admin') then
+        raise exception 'Only reviewers can read request forms' using errcode = '42501';
+    end if;
+
+    return (select r.form_data from public.clearancerequests r where r.id = p_request_id);
+end;
+$$;
+
+grant execute on function public.review_form_data to authenticated;
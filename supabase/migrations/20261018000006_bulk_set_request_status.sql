@@ -0,0 +1,71 @@
+-- Bulk review decisions: one statement updates every selected pending request
+-- of a department, one insert notifies all affected students, and every
+-- requested id comes back with either its new status or the reason it was
+-- left alone.
+
+create or replace function public.bulk_set_request_status(
+    p_department_id public.clearancerequests.department_id%type,
+    -- %type cannot be followed by [] in a signature, so the array spells out
+    -- the id column's type
+    p_request_ids bigint[],
+    p_status public.clearancerequests.status%type,
+    p_message text
+)
+returns table (
+    request_id public.clearancerequests.id%type,
+    updated boolean,
+    status public.clearancerequests.status%type,
+    error text
+)
+language plpgsql
+-- Runs with the owner's rights so it does not depend on clearancerequests'
+-- row level security; the role check below is the gate
+security definer
+set search_path = public
+as $$
+#variable_conflict use_column
+begin
+    if coalesce((select u.role from public.users u where u.id = auth.uid()), '') not in ('reviewer', 'admin') then
+        raise exception 'Only reviewers can change request statuses' using errcode = '42501';
+    end if;
+
+    if p_status not in ('Approved', 'Rejected') then
+        raise exception 'Unsupported review status %', p_status using errcode = '22023';
+    end if;
+
+    return query
+    with requested as (
+        select distinct unnest(p_request_ids) as id
+    ),
+    changed as (
+        update public.clearancerequests r
+        set status = p_status
+        from requested q
+        where r.id = q.id
+          and r.department_id = p_department_id
+          and r.status = 'Pending'
+        returning r.id, r.user_id
+    ),
+    notified as (
+        insert into public.notifications (user_id, message, created_at)
+        select c.user_id, p_message, now()
+        from changed c
+    )
+    -- Every CTE sees the same snapshot, so r still shows the pre-update row
+    select
+        q.id,
+        c.id is not null,
+        case when c.id is not null then p_status else r.status end,
+        case
+            when c.id is not null then null
+            when r.id is null then 'Request not found'
+            when r.department_id <> p_department_id then 'Request belongs to another department'
+            else 'Request is already ' || r.status
+        end
+    from requested q
+    left join changed c on c.id = q.id
+    left join public.clearancerequests r on r.id = q.id;
+end;
+$$;
+
+grant execute on function public.bulk_set_request_status to authenticated;
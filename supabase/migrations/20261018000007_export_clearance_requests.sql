@@ -0,0 +1,37 @@
+-- Registrar export: every clearance request with its student and department,
+-- read a page at a time with keyset pagination on the primary key. Each page
+-- is a range scan of clearancerequests_pkey starting after the last id the
+-- caller saw, so a full dump never holds a long-running statement or pays
+-- for OFFSET.
+--
+-- The result covers every student, so only the service role may call it.
+
+create or replace function public.export_clearance_requests(
+    p_after_id public.clearancerequests.id%type default null,
+    p_limit integer default 1000
+)
+returns table (
+    request_id public.clearancerequests.id%type,
+    status public.clearancerequests.status%type,
+    submitted_at public.clearancerequests.submitted_at%type,
+    department_id public.departments.id%type,
+    department_name public.departments.name%type,
+    user_id public.clearancerequests.user_id%type,
+    student_id public.students.student_id%type,
+    full_name public.students.full_name%type,
+    email public.students.email%type
+)
+language sql
+stable
+as $$
+    select r.id, r.status, r.submitted_at, d.id, d.name, r.user_id, s.student_id, s.full_name, s.email
+    from public.clearancerequests r
+    left join public.departments d on d.id = r.department_id
+    left join public.students s on s.id = r.user_id
+    where r.id > coalesce(p_after_id, 0)
+    order by r.id
+    limit least(greatest(p_limit, 1), 5000);
+$$;
+
+revoke execute on function public.export_clearance_requests from public, anon, authenticated;
+grant execute on function public.export_clearance_requests to service_role;
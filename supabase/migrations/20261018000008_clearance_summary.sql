@@ -0,0 +1,142 @@
+-- Per-student clearance summary, kept current by triggers so the progress and
+-- profile screens read one row by primary key instead of aggregating over
+-- every department on each visit.
+--
+-- A change to clearancerequests refreshes only the students it touched, once
+-- per statement: a bulk review of 5000 requests recomputes each affected
+-- student once, using clearancerequests_user_department_key. Adding,
+-- renaming or removing a department changes every summary, so that rarer
+-- case refreshes them all.
+
+create table if not exists public.clearance_summary (
+    user_id uuid primary key,
+    departments_total integer not null,
+    departments_submitted integer not null,
+    departments_approved integer not null,
+    departments_pending integer not null,
+    completion_percentage numeric(5, 2) not null,
+    -- Department name -> latest request status, null when nothing was submitted
+    statuses jsonb not null,
+    last_change_at timestamptz not null default now()
+);
+
+-- Students read only their own row; the triggers write as the definer
+alter table public.clearance_summary enable row level security;
+
+drop policy if exists "Students read their own summary" on public.clearance_summary;
+create policy "Students read their own summary"
+    on public.clearance_summary
+    for select
+    to authenticated
+    using (user_id = auth.uid());
+
+create or replace function public.refresh_clearance_summary(
+    p_user_ids uuid[],
+    p_touch boolean default true
+)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    insert into public.clearance_summary as cs (
+        user_id, departments_total, departments_submitted, departments_approved, departments_pending,
+        completion_percentage, statuses, last_change_at
+    )
+    select
+        u.user_id,
+        count(*),
+        count(r.status),
+        count(*) filter (where r.status = 'Approved'),
+        count(*) filter (where r.status = 'Pending'),
+        round(100.0 * count(r.status) / count(*), 2),
+        jsonb_object_agg(d.name, r.status),
+        now()
+    from (select distinct unnest(p_user_ids) as user_id) u
+    cross join public.departments d
+    left join lateral (
+        select cr.status
+        from public.clearancerequests cr
+        where cr.user_id = u.user_id
+          and cr.department_id = d.id
+        order by cr.submitted_at desc
+        limit 1
+    ) r on true
+    where u.user_id is not null
+    group by u.user_id
+    on conflict (user_id) do update set
+        departments_total = excluded.departments_total,
+        departments_submitted = excluded.departments_submitted,
+        departments_approved = excluded.departments_approved,
+        departments_pending = excluded.departments_pending,
+        completion_percentage = excluded.completion_percentage,
+        statuses = excluded.statuses,
+        -- Catalogue changes are not a change in the student's own clearance
+        last_change_at = case when p_touch then excluded.last_change_at else cs.last_change_at end;
+$$;
+
+create or replace function public.clearance_summary_requests_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    -- Transition tables hold every row the statement changed
+    if tg_op = 'INSERT' then
+        perform public.refresh_clearance_summary(array(select distinct user_id from new_rows));
+    elsif tg_op = 'UPDATE' then
+        perform public.refresh_clearance_summary(array(
+            select user_id from new_rows union select user_id from old_rows
+        ));
+    else
+        perform public.refresh_clearance_summary(array(select distinct user_id from old_rows));
+    end if;
+    return null;
+end;
+$$;
+
+create or replace function public.clearance_summary_departments_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    perform public.refresh_clearance_summary(array(select user_id from public.clearance_summary), false);
+    return null;
+end;
+$$;
+
+drop trigger if exists clearance_summary_on_insert on public.clearancerequests;
+create trigger clearance_summary_on_insert
+    after insert on public.clearancerequests
+    referencing new table as new_rows
+    for each statement execute function public.clearance_summary_requests_trigger();
+
+drop trigger if exists clearance_summary_on_update on public.clearancerequests;
+create trigger clearance_summary_on_update
+    after update on public.clearancerequests
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function public.clearance_summary_requests_trigger();
+
+drop trigger if exists clearance_summary_on_delete on public.clearancerequests;
+create trigger clearance_summary_on_delete
+    after delete on public.clearancerequests
+    referencing old table as old_rows
+    for each statement execute function public.clearance_summary_requests_trigger();
+
+drop trigger if exists clearance_summary_on_departments on public.departments;
+create trigger clearance_summary_on_departments
+    after insert or update of name or delete on public.departments
+    for each statement execute function public.clearance_summary_departments_trigger();
+
+-- Backfill students who already have requests; everyone else has no row,
+-- and readers fall back to the aggregate for them
+select public.refresh_clearance_summary(array(select distinct user_id from public.clearancerequests));
+
+-- Only the triggers write to it
+revoke all on public.clearance_summary from anon;
+grant select on public.clearance_summary to authenticated;
+revoke insert, update, delete on public.clearance_summary from authenticated;
+revoke execute on function public.refresh_clearance_summary from public, anon, authenticated;
@@ -0,0 +1,27 @@
+import time
+
+import httpx
+
+from app.data import outbox
+
+
+def test_transient_failure_defers_the_rest_of_the_queue(monkeypatch):
+    calls = []
+
+    def failing(user_id, payload):
+        calls.append(time.monotonic())
+        raise httpx.ConnectError("offline")
+
+    monkeypatch.setitem(outbox.HANDLERS, "test", failing)
+    monkeypatch.setattr(outbox, "BACKOFF_BASE", 5)
+    box = outbox.Outbox(":memory:")
+    for i in range(10):
+        box.enqueue("test", f"test:{i}", "user", {})
+    try:
+        time.sleep(1)
+    finally:
+        box.stop()
+
+    # One probe, then every queued write waits for the backoff
+    assert len(calls) == 1
+    assert len(box.pending("user", "test")) == 10